@@ -5,7 +5,23 @@ import pandas as pd
 from sqlmodel import select
 from AlphaMachine_core.models import TickerPeriod, TickerInfo, PriceData
 from AlphaMachine_core.db import get_session
-from sqlalchemy import func
+from sqlalchemy import delete, func, insert
+
+def _price_rows(new_df: pd.DataFrame) -> list[dict]:
+    """
+    Insert-Zeilen für PriceData: Typen spaltenweise casten, to_dict liefert
+    native Python-Werte. Fehlendes Volumen (yfinance liefert teils NaN) wird
+    0, sonst scheitert der int-Cast für den ganzen Ticker.
+    """
+    return (
+        new_df[['ticker', 'date', 'open', 'high', 'low', 'close', 'volume']]
+        .rename(columns={'date': 'trade_date'})
+        .fillna({'volume': 0})
+        .astype({'open': float, 'high': float, 'low': float,
+                 'close': float, 'volume': 'int64'})
+        .to_dict('records')
+    )
+
 
 class StockDataManager:
     """
@@ -21,25 +37,25 @@ class StockDataManager:
             else (pd.to_datetime(start) + pd.offsets.MonthEnd(1)).date())
         created = []
         with get_session() as session:
+            # vorhandene Einträge mit einer Projektion statt einer ORM-Abfrage pro Ticker
+            existing = set(session.exec(
+                select(TickerPeriod.ticker).where(
+                    TickerPeriod.ticker.in_(tickers),
+                    TickerPeriod.start_date == start,
+                    TickerPeriod.end_date   == end,
+                    TickerPeriod.source     == source_name
+                )
+            ).all())
             for t in tickers:
-                exists = session.exec(
-                    select(TickerPeriod).where(
-                        TickerPeriod.ticker    == t,
-                        TickerPeriod.start_date == start,
-                        TickerPeriod.end_date   == end,
-                        TickerPeriod.source     == source_name
-                    )
-                ).first()
-                if not exists:
-                    obj = TickerPeriod(
-                        ticker     = t,
-                        start_date = start,
-                        end_date   = end,
-                        source     = source_name
-                    )
-                    session.add(obj)
+                if t not in existing:
+                    existing.add(t)
                     created.append(t)
             if created:
+                # ein Bulk-INSERT (executemany) statt ORM-Objekt pro Ticker
+                session.execute(insert(TickerPeriod), [
+                    {"ticker": t, "start_date": start, "end_date": end, "source": source_name}
+                    for t in created
+                ])
                 session.commit()
         return created
 
@@ -61,12 +77,14 @@ class StockDataManager:
                 ).first()
             start_date = (last + dt.timedelta(days=1)) if last else history_dt
 
-            raw = yf.download(
-                ticker,
+            # Ticker.history statt yf.download: download() sammelt Ergebnisse in
+            # globalem Modul-State und ist daher nicht thread-sicher (Updates
+            # laufen aus der App parallel im ThreadPool)
+            raw = yf.Ticker(ticker).history(
                 start=start_date,
                 end=today + dt.timedelta(days=1),
-                progress=False,
-                auto_adjust=False
+                auto_adjust=False,
+                actions=False
             )
             if raw.empty:
                 continue
@@ -93,18 +111,8 @@ class StockDataManager:
                 continue
 
             with get_session() as session:
-                objs = [
-                    PriceData(
-                        ticker=r['ticker'],
-                        trade_date=r['date'],
-                        open=float(r['open']),
-                        high=float(r['high']),
-                        low=float(r['low']),
-                        close=float(r['close']),
-                        volume=int(r['volume'])
-                    ) for r in new_df.to_dict('records')
-                ]
-                session.add_all(objs)
+                # ORM-Bulk-INSERT mit Attributnamen (trade_date → Spalte "date")
+                session.execute(insert(PriceData), _price_rows(new_df))
                 session.commit()
 
             print(f"🚧 Calling _update_ticker_info for {ticker}")
@@ -178,12 +186,40 @@ class StockDataManager:
                 )
             ).all()
 
+    def get_periods_frame(self, month: str, source: str) -> pd.DataFrame:
+        """
+        Wie get_periods, aber als DataFrame direkt aus den Spalten (ohne
+        ORM-Objekte); start_date/end_date einmal als datetime64 geparst.
+        """
+        stmt = (
+            select(
+                TickerPeriod.id,
+                TickerPeriod.ticker,
+                TickerPeriod.start_date,
+                TickerPeriod.end_date,
+                TickerPeriod.source,
+            )
+            .where(
+                func.to_char(TickerPeriod.start_date, 'YYYY-MM') == month,
+                TickerPeriod.source == source
+            )
+        )
+        with get_session() as session:
+            return pd.read_sql_query(
+                stmt, session.connection(), parse_dates=["start_date", "end_date"]
+            )
+
     def get_ticker_info(self):
         with get_session() as session:
             return session.exec(
                 select(TickerInfo)
             ).all()
 
+    def get_ticker_info_frame(self) -> pd.DataFrame:
+        """Alle TickerInfo-Zeilen als DataFrame (Tabellenspalten, kein _sa_instance_state)."""
+        with get_session() as session:
+            return pd.read_sql_query(TickerInfo.__table__.select(), session.connection())
+
     def get_price_data(self, tickers, start_date, end_date):
         sd = pd.to_datetime(start_date)
         ed = pd.to_datetime(end_date)
@@ -197,6 +233,36 @@ class StockDataManager:
                 )
             ).all()
 
+    def get_price_frame(self, tickers, start_date, end_date, columns=("close",)) -> pd.DataFrame:
+        """
+        Wie get_price_data, liefert aber direkt ein Long-DataFrame
+        (trade_date, ticker, *columns) – ohne ORM-Hydration und ohne
+        dict-pro-Zeile; pandas baut die Spalten direkt aus dem Cursor.
+        `ticker` ist kategorisch, damit Pivot/Groupby auf Integer-Codes laufen.
+        Zeilen kommen nach trade_date sortiert (ORDER BY in der DB).
+        """
+        sd = pd.to_datetime(start_date)
+        ed = pd.to_datetime(end_date)
+        stmt = (
+            select(
+                PriceData.trade_date.label("trade_date"),
+                PriceData.ticker,
+                *(getattr(PriceData, c) for c in columns),
+            )
+            .where(
+                PriceData.ticker.in_(tickers),
+                PriceData.trade_date >= sd,
+                PriceData.trade_date <= ed
+            )
+            .order_by(PriceData.trade_date)
+        )
+        with get_session() as session:
+            df = pd.read_sql_query(
+                stmt, session.connection(), parse_dates=["trade_date"]
+            )
+        df["ticker"] = df["ticker"].astype("category")
+        return df
+
     def delete_period(self, period_id: int) -> bool:
         with get_session() as session:
             obj = session.get(TickerPeriod, period_id)
@@ -206,6 +272,17 @@ class StockDataManager:
                 return True
         return False
 
+    def delete_periods(self, period_ids: list[int]) -> int:
+        """Löscht mehrere TickerPeriod-Einträge in einem DELETE … WHERE id IN (…)."""
+        if not period_ids:
+            return 0
+        with get_session() as session:
+            result = session.exec(
+                delete(TickerPeriod).where(TickerPeriod.id.in_(period_ids))
+            )
+            session.commit()
+            return result.rowcount
+
     def get_periods_distinct_months(self) -> list[str]:
         """Gibt alle Monate zurück, in denen es TickerPeriod-Einträge gibt."""
         with get_session() as session:
@@ -214,6 +291,14 @@ class StockDataManager:
             ).all()
         return rows
 
+    def get_sources_distinct(self) -> list[str]:
+        """Gibt alle Quellen zurück, für die es TickerPeriod-Einträge gibt."""
+        with get_session() as session:
+            rows = session.exec(
+                select(TickerPeriod.source).distinct()
+            ).all()
+        return rows
+
     def get_tickers_for(self, month: str, sources: list[str]) -> list[str]:
         """Liefert alle Ticker für den angegebenen Monat und die Quellen."""
         with get_session() as session:
@@ -223,5 +308,6 @@ class StockDataManager:
                     func.to_char(TickerPeriod.start_date, 'YYYY-MM') == month,
                     TickerPeriod.source.in_(sources)
                 )
+                .distinct()
             ).all()
         return rows
\ No newline at end of file
@@ -1,15 +1,35 @@
 # AlphaMachine_core/db.py
 
+from functools import lru_cache
+
 from sqlmodel import SQLModel, create_engine, Session
+from sqlalchemy.engine import make_url
 from sqlalchemy.exc import OperationalError
+from sqlalchemy.pool import NullPool
 from AlphaMachine_core.config import DATABASE_URL
 
 #  → Damit die Models registriert werden:
 
-engine = create_engine(
-    DATABASE_URL,
-    echo=False,
-)
+@lru_cache(maxsize=1)
+def get_engine():
+    """
+    Engine erst beim ersten Zugriff erzeugen (nicht schon beim Import) –
+    einmal pro Prozess. pre_ping/recycle fangen vom Server geschlossene
+    Verbindungen ab, statt mitten in einer Abfrage zu scheitern.
+
+    Supabase-Pooler (:6543) ist pgbouncer im Transaction-Mode: dort hält
+    pgbouncer die Verbindungen, ein zweiter Pool auf unserer Seite führt nur
+    zu toten Connections → NullPool. Direkte Verbindung (:5432) behält den
+    Standard-Pool.
+    """
+    url = make_url(DATABASE_URL)
+    kwargs = {"pool_pre_ping": True, "pool_recycle": 1800}
+    if url.port == 6543:
+        kwargs = {"poolclass": NullPool}
+        # nur Default setzen – ein strengeres sslmode aus der URL (verify-full) gewinnt
+        if "sslmode" not in url.query:
+            kwargs["connect_args"] = {"sslmode": "require"}
+    return create_engine(DATABASE_URL, echo=False, **kwargs)
 
 def init_db():
     """
@@ -18,10 +38,10 @@ def init_db():
     try:
         # weil wir AlphaMachine_core.models importiert haben,
         # enthält SQLModel.metadata jetzt alle drei Tables
-        SQLModel.metadata.create_all(engine)
+        SQLModel.metadata.create_all(get_engine())
         print("✅ init_db: create_all() ausgeführt")
     except OperationalError as e:
         print(f"⚠️ Could not init DB tables: {e}")
 
 def get_session() -> Session:
-    return Session(engine)
+    return Session(get_engine())
@@ -1,3 +1,6 @@
+import hashlib
+from functools import lru_cache
+
 import pandas as pd
 import numpy as np
 from AlphaMachine_core.optimizers import optimize_portfolio
@@ -24,6 +27,77 @@ from AlphaMachine_core.config import (
 )
 
 
+class _ReturnsWindow:
+    """
+    Hashbarer Wrapper um ein Rendite-Fenster: Schlüssel ist der Inhalt
+    (Spalten, Datumsachse, Werte), nicht die Objekt-Identität.
+    """
+
+    __slots__ = ("returns", "key")
+
+    def __init__(self, returns: pd.DataFrame):
+        self.returns = returns
+        digest = hashlib.blake2b(digest_size=16)
+        digest.update(returns.index.asi8.tobytes())
+        digest.update(np.ascontiguousarray(returns.to_numpy()).tobytes())
+        self.key = (tuple(returns.columns), returns.shape, digest.digest())
+
+    def __hash__(self):
+        return hash(self.key)
+
+    def __eq__(self, other):
+        return isinstance(other, _ReturnsWindow) and self.key == other.key
+
+
+@lru_cache(maxsize=64)
+def _cached_optimize(
+    window: _ReturnsWindow,
+    method,
+    cov_estimator,
+    min_weight,
+    max_weight,
+    force_equal_weight,
+    debug_label,
+    num_stocks,
+) -> pd.Series:
+    # Identische Fenster (z. B. wiederholte Optuna-Trials) werden nur einmal gelöst
+    return optimize_portfolio(
+        returns=window.returns,
+        method=method,
+        cov_estimator=cov_estimator,
+        min_weight=min_weight,
+        max_weight=max_weight,
+        force_equal_weight=force_equal_weight,
+        debug_label=debug_label,
+        num_stocks=num_stocks,
+    )
+
+
+def _drawdown_stats(values, drawdown=None) -> tuple:
+    """
+    Drawdown-Kennzahlen in einem Durchlauf über einen einzigen Arbeitspuffer:
+    (max_dd, ulcer_index in %, avg_dd). Ohne negative Drawdowns → NaN für UI/avg.
+    Ist `drawdown` (pv/peak - 1) schon bekannt, wird nur eine Kopie davon benutzt.
+    """
+    if drawdown is None:
+        pv = np.asarray(values, dtype=np.float64)
+        buf = np.maximum.accumulate(pv)
+        np.divide(pv, buf, out=buf)
+        buf -= 1.0
+    else:
+        buf = np.array(drawdown, dtype=np.float64)
+    max_dd = float(buf.min())
+
+    np.minimum(buf, 0.0, out=buf)
+    n_neg = np.count_nonzero(buf)
+    if n_neg == 0:
+        return max_dd, np.nan, np.nan
+
+    ui = np.sqrt(np.dot(buf, buf) * 1e4 / n_neg)
+    avg_dd = -buf.sum() / n_neg
+    return max_dd, float(ui), float(avg_dd)
+
+
 class SharpeBacktestEngine:
     def __init__(
         self,
@@ -45,6 +119,7 @@ class SharpeBacktestEngine:
         fixed_cost_per_trade: float = FIXED_COST_PER_TRADE,
         variable_cost_pct: float = VARIABLE_COST_PCT,
         optimization_mode: str = OPTIMIZATION_MODE,
+        returns: pd.DataFrame | None = None,
     ):
         # ➊ Unveränderliche Kern-Parameter
         self.price_data      = price_data
@@ -56,6 +131,7 @@ class SharpeBacktestEngine:
         self.universe_mode   = universe_mode.lower()
 
         # ➌ Coverage-Filter nur im dynamischen ("dynamic") Mode anwenden
+        self.ticker_coverage_logs = []
         if self.universe_mode == "dynamic":
             self._filter_complete_tickers()
         else:
@@ -69,12 +145,17 @@ class SharpeBacktestEngine:
         self.daily_df           = pd.DataFrame()
         self.monthly_allocations= pd.DataFrame()
         self.selection_details  = []
+        self.selection_df       = pd.DataFrame()
         self.log_lines          = []
-        self.ticker_coverage_logs = []
         self.missing_months     = []
         self.performance_metrics= pd.DataFrame()
         self.monthly_performance= pd.DataFrame()
+        self.monthly_pnl_pct    = pd.Series(dtype=float)
         self.total_trading_costs= 0.0
+        self._period_cache      = {}
+        self._prices            = None
+        self.pv_peak            = np.empty(0)
+        self.pv_drawdown        = np.empty(0)
 
         # ➎ Optimierungs- & Rebalance-Parameter setzen
         self.optimize_weights       = optimize_weights if optimize_weights is not None else OPTIMIZE_WEIGHTS
@@ -91,47 +172,87 @@ class SharpeBacktestEngine:
         self.variable_cost_pct      = variable_cost_pct
         self.optimization_mode      = optimization_mode if optimization_mode is not None else OPTIMIZATION_MODE
 
+        # ➏ Optional vorberechnete Roh-Renditen (price_data.pct_change()),
+        #    z. B. einmal pro Optuna-Studie statt pro Trial
+        self._precomputed_returns   = returns
+
+    @classmethod
+    def from_arrays(cls, prices: np.ndarray, dates, tickers, *args, **kwargs) -> "SharpeBacktestEngine":
+        """
+        Baut den Engine direkt aus (prices, dates, tickers), z. B.
+        `price_df.to_numpy()`, `price_df.index.values`, `price_df.columns.values`,
+        ohne die Preismatrix zu kopieren.
+        """
+        price_data = pd.DataFrame(
+            prices,
+            index=pd.DatetimeIndex(dates),
+            columns=pd.Index(tickers),
+            copy=False,
+        )
+        return cls(price_data, *args, **kwargs)
+
+    def _optimize(self, returns: pd.DataFrame, debug_label: str, num_stocks: int) -> pd.Series:
+        """
+        Ruft `optimize_portfolio` über den LRU-Cache auf; liefert eine Kopie,
+        damit der gecachte Eintrag nicht verändert werden kann.
+        """
+        return _cached_optimize(
+            _ReturnsWindow(returns),
+            self.optimizer_method,
+            self.cov_estimator,
+            self.min_weight,
+            self.max_weight,
+            self.force_equal_weight,
+            debug_label,
+            num_stocks,
+        ).copy()
 
     def _get_valid_tickers(self, threshold=0.95):
         full_range = pd.date_range(
             start=self.price_data.index.min(), end=self.price_data.index.max(), freq="B"
         )
-        min_coverage_days = int(len(full_range) * threshold)
+        n_days = len(full_range)
+        min_coverage_days = int(n_days * threshold)
         valid = []
         invalid = []
         missing_by_month = {}
 
-        for col in self.price_data.columns:
-            col_data = self.price_data[col].dropna()
-            col_dates = col_data.index
-            coverage = len(col_dates)
-            coverage_pct = coverage / len(full_range) * 100
+        # Bool-Masken (1 Byte/Zelle) statt Float; Reduktionen in int32
+        present = self.price_data.notna().to_numpy()
+        coverage_arr = present.sum(axis=0, dtype=np.int32)
+        in_range = self.price_data.reindex(full_range).notna().to_numpy()
+        month_labels = full_range.strftime("%Y-%m").to_numpy()
+        index = self.price_data.index
+
+        for j, col in enumerate(self.price_data.columns):
+            coverage = int(coverage_arr[j])
+            coverage_pct = coverage / n_days * 100
+            rows = np.flatnonzero(present[:, j])
+            first = index[rows[0]].date() if rows.size else None
+            last = index[rows[-1]].date() if rows.size else None
 
             if coverage >= min_coverage_days:
                 valid.append(col)
                 self.ticker_coverage_logs.append(
-                    f"📈 {col} | {col_dates.min().date()}–{col_dates.max().date()} | {coverage}/{len(full_range)} ({coverage_pct:.1f}%)"
+                    f"📈 {col} | {first}–{last} | {coverage}/{n_days} ({coverage_pct:.1f}%)"
                 )
             else:
                 invalid.append(
                     {
                         "Ticker": col,
-                        "Start Date": (
-                            col_dates.min().date() if not col_dates.empty else None
-                        ),
-                        "End Date": (
-                            col_dates.max().date() if not col_dates.empty else None
-                        ),
-                        "Coverage": f"{coverage}/{len(full_range)} ({coverage_pct:.1f}%)",
+                        "Start Date": first,
+                        "End Date": last,
+                        "Coverage": f"{coverage}/{n_days} ({coverage_pct:.1f}%)",
                     }
                 )
                 self.ticker_coverage_logs.append(
-                    f"❌ {col} | {coverage}/{len(full_range)} days ({coverage_pct:.1f}%)"
+                    f"❌ {col} | {coverage}/{n_days} days ({coverage_pct:.1f}%)"
+                )
+                months, counts = np.unique(
+                    month_labels[~in_range[:, j]], return_counts=True
                 )
-                for date in full_range[~full_range.isin(col_dates)]:
-                    month = date.strftime("%Y-%m")
-                    missing_by_month.setdefault(month, {}).setdefault(col, 0)
-                    missing_by_month[month][col] += 1
+                for month, cnt in zip(months, counts):
+                    missing_by_month.setdefault(str(month), {})[col] = int(cnt)
 
         return valid, invalid, missing_by_month
 
@@ -163,8 +284,15 @@ class SharpeBacktestEngine:
         self.num_stocks verfügbare Ticker (setzt n_stocks = available).
         """
 
-        # 1) Renditen berechnen und vollständig leere Zeilen entfernen
-        returns = self.price_data.pct_change().dropna(how="all")
+        self._period_cache = {}
+
+        # 1) Renditen berechnen (oder vorberechnete übernehmen) und
+        #    vollständig leere Zeilen entfernen
+        if self._precomputed_returns is not None:
+            returns = self._precomputed_returns[self.price_data.columns]
+        else:
+            returns = self.price_data.pct_change()
+        returns = returns.dropna(how="all")
 
         # **NEU**: Alle verbliebenen NaNs durch 0 ersetzen,
         # damit LedoitWolf & Co. sauber rechnen können
@@ -193,10 +321,16 @@ class SharpeBacktestEngine:
         ).to_period("M")
 
         balance = self.start_balance
-        portfolio_values = pd.Series(index=self.price_data.index, dtype=float)
+        # Preise einmal als C-contiguous ndarray (Zeilen-Blöcke = ein
+        # zusammenhängender Speicherbereich); Tages-Schleife arbeitet nur auf Views
+        dates      = self.price_data.index
+        self._prices = np.ascontiguousarray(self.price_data.to_numpy())
+        prices_arr = self._prices
+        col_pos    = {t: j for j, t in enumerate(self.price_data.columns)}
+        portfolio_values = np.full(len(dates), np.nan)
         self.selection_details = []
         current_positions = {}
-        daily_data = []
+        daily_parts = []
         monthly_allocations = []
         self.total_trading_costs = 0.0
 
@@ -239,28 +373,10 @@ class SharpeBacktestEngine:
                 # Variante A: zuerst Top N, dann Gewichte optimieren
                 top_tickers = filtered_returns.columns[:n_stocks]
                 filtered_top = filtered_returns[top_tickers]
-                weights_series = optimize_portfolio(
-                    returns=filtered_top,
-                    method=self.optimizer_method,
-                    cov_estimator=self.cov_estimator,
-                    min_weight=self.min_weight,
-                    max_weight=self.max_weight,
-                    force_equal_weight=self.force_equal_weight,
-                    debug_label="A - Optimizer only weight",
-                    num_stocks=n_stocks,
-                )
+                weights_series = self._optimize(filtered_top, "A - Optimizer only weight", n_stocks)
             else:
                 # Variante B: gesamte Menge gewichten, dann Top N nach Gewicht auswählen
-                weights_full = optimize_portfolio(
-                    returns=filtered_returns,
-                    method=self.optimizer_method,
-                    cov_estimator=self.cov_estimator,
-                    min_weight=self.min_weight,
-                    max_weight=self.max_weight,
-                    force_equal_weight=self.force_equal_weight,
-                    debug_label="B - Optimizer selects & weights",
-                    num_stocks=n_stocks,
-                )
+                weights_full = self._optimize(filtered_returns, "B - Optimizer selects & weights", n_stocks)
                 top_tickers = weights_full.sort_values(ascending=False).head(n_stocks).index.tolist()
                 weights_series = weights_full.loc[top_tickers]
 
@@ -301,31 +417,45 @@ class SharpeBacktestEngine:
             print(log_msg)
             self.log_lines.append(log_msg)
 
-            # Daily-Portfolio-Werte
-            for day in self.price_data.loc[start_date:end_date].index:
-                daily_value = 0
-                for ticker, pos in current_positions.items():
-                    price = self.price_data.at[day, ticker] if ticker in self.price_data.columns else np.nan
-                    if not np.isnan(price):
-                        value = pos["shares"] * price
-                        daily_value += value
-                        daily_data.append({
-                            "Date":                 day.date(),
-                            "Ticker":               ticker,
-                            "Close Price":          price,
-                            "Shares":               pos["shares"],
-                            "Allocated Amount":     value,
-                            "Allocated Percentage (%)": pos["weight"]*100,
-                            "Total Portfolio Value":    daily_value,
-                            "Is_Rebalance_Day":         day == start_date,
-                            "Trading Costs":            pos.get("trading_costs",0) if day==start_date else 0,
-                        })
-                portfolio_values[day] = daily_value
-                balance = daily_value
+            # Daily-Portfolio-Werte (Block Tage × Positionen auf einer View)
+            lo = dates.searchsorted(start_date, side="left")
+            hi = dates.searchsorted(end_date, side="right")
+            if hi <= lo:
+                continue
+            held = [(t, pos) for t, pos in current_positions.items() if t in col_pos]
+            block = prices_arr[lo:hi, [col_pos[t] for t, _ in held]]
+            shares = np.array([pos["shares"] for _, pos in held], dtype=float)
+            valid = ~np.isnan(block)
+            values = np.where(valid, block * shares, 0.0)
+            # laufende Summe je Tag in Positions-Reihenfolge ("Total Portfolio Value")
+            running = np.cumsum(values, axis=1)
+            day_totals = running[:, -1] if held else np.zeros(hi - lo)
+            portfolio_values[lo:hi] = day_totals
+            balance = day_totals[-1]
+
+            rows, cols = np.nonzero(valid)
+            if rows.size:
+                block_dates = dates[lo:hi]
+                is_reb = np.asarray(block_dates == start_date)[rows]
+                costs = np.array([pos.get("trading_costs", 0) for _, pos in held], dtype=float)
+                weights_arr = np.array([pos["weight"] for _, pos in held], dtype=float)
+                daily_parts.append(pd.DataFrame({
+                    "Date":                 block_dates.date[rows],
+                    "Ticker":               np.array([t for t, _ in held], dtype=object)[cols],
+                    "Close Price":          block[rows, cols],
+                    "Shares":               shares[cols],
+                    "Allocated Amount":     values[rows, cols],
+                    "Allocated Percentage (%)": weights_arr[cols] * 100,
+                    "Total Portfolio Value":    running[rows, cols],
+                    "Is_Rebalance_Day":         is_reb,
+                    "Trading Costs":            np.where(is_reb, costs[cols], 0.0),
+                }))
 
         # Ergebnis-DataFrames füllen
-        self.portfolio_value     = portfolio_values.dropna()
-        self.daily_df            = pd.DataFrame(daily_data)
+        self.portfolio_value     = pd.Series(portfolio_values, index=dates).dropna()
+        self.daily_df            = (
+            pd.concat(daily_parts, ignore_index=True) if daily_parts else pd.DataFrame()
+        )
         self.monthly_allocations = pd.DataFrame(monthly_allocations)
 
         # SUMMARY-Zeile für Trading-Kosten
@@ -340,10 +470,15 @@ class SharpeBacktestEngine:
             "Total Trading Costs": self.total_trading_costs,
             "Trading Costs %":     (self.total_trading_costs/self.start_balance)*100,
         })
+        # einmal als DataFrame für App-Ansicht + Excel-Export
+        self.selection_df = pd.DataFrame.from_records(self.selection_details)
 
         # Fehlende Monate protokollieren
         actual_months = (
-            pd.to_datetime([d["Rebalance Date"] for d in self.selection_details if d["Rebalance Date"]!="SUMMARY"])
+            pd.to_datetime(
+                [d["Rebalance Date"] for d in self.selection_details if d["Rebalance Date"]!="SUMMARY"],
+                format="%Y-%m-%d",
+            )
             .to_series().dt.to_period("M").drop_duplicates()
         )
         self.missing_months = [
@@ -368,27 +503,9 @@ class SharpeBacktestEngine:
             n_nm = min(self.num_stocks, available_nm)
             if self.optimization_mode == "select-then-optimize":
                 top_sharpe = select_top_sharpe_tickers(sub_returns, top_universe_size)[:n_nm]
-                weights_nm = optimize_portfolio(
-                    returns=sub_returns[top_sharpe],
-                    method=self.optimizer_method,
-                    cov_estimator=self.cov_estimator,
-                    min_weight=self.min_weight,
-                    max_weight=self.max_weight,
-                    force_equal_weight=self.force_equal_weight,
-                    debug_label="NextMonth A",
-                    num_stocks=n_nm,
-                )
+                weights_nm = self._optimize(sub_returns[top_sharpe], "NextMonth A", n_nm)
             else:
-                wf = optimize_portfolio(
-                    returns=sub_returns,
-                    method=self.optimizer_method,
-                    cov_estimator=self.cov_estimator,
-                    min_weight=self.min_weight,
-                    max_weight=self.max_weight,
-                    force_equal_weight=self.force_equal_weight,
-                    debug_label="NextMonth B",
-                    num_stocks=n_nm,
-                )
+                wf = self._optimize(sub_returns, "NextMonth B", n_nm)
                 top_sharpe = wf.sort_values(ascending=False).head(n_nm).index.tolist()
                 weights_nm = wf.loc[top_sharpe]
 
@@ -403,12 +520,42 @@ class SharpeBacktestEngine:
         print("🔮 Next-Month-Universe:", getattr(self, "next_month_tickers", []))
         self._calculate_performance_metrics()
 
+        # Monats-/Jahresframes gleich hier bauen: nach dem Lauf wird die Engine
+        # nur noch gelesen (sie kann per st.cache_resource sessionübergreifend
+        # geteilt werden – keine Lazy-Writes aus den UI-Ansichten)
+        self._period_cache = {f: self._compute_period_frames(f) for f in ("ME", "YE")}
+
         return self.portfolio_value
 
+    def period_frames(self, freq: str) -> tuple[pd.DataFrame, pd.Series, pd.Series]:
+        """
+        Periodenend-Renditen (%) aller Ticker, Periodenend-Portfolio-Wert und
+        Portfolio-Periodenrendite (%) für `freq` ("ME" / "YE"), jeweils mit
+        Index-Namen "Date". "ME"/"YE" werden am Ende des Laufs vorberechnet;
+        hier wird nur gelesen (andere Frequenzen: berechnet, nicht gespeichert).
+        Die Frames werden geteilt – Aufrufer dürfen sie nicht in-place ändern.
+        """
+        cached = self._period_cache.get(freq)
+        if cached is None:
+            return self._compute_period_frames(freq)
+        return cached
+
+    def _compute_period_frames(self, freq: str) -> tuple[pd.DataFrame, pd.Series, pd.Series]:
+        prices  = self.price_data.resample(freq).last()
+        balance = self.portfolio_value.resample(freq).last()
+        prices.index.name  = "Date"
+        balance.index.name = "Date"
+        return (
+            prices.pct_change().dropna(how="all") * 100,
+            balance,
+            balance.pct_change().dropna() * 100,
+        )
+
     def _calculate_performance_metrics(self):
         """
         Berechnet alle Performance‑Kennzahlen des Backtests und legt sie in
-        `self.performance_metrics` sowie `self.monthly_performance` ab.
+        `self.performance_metrics`, `self.monthly_performance` sowie
+        `self.monthly_pnl_pct` (Monats-PnL in %, DatetimeIndex "Date") ab.
         """
 
         # ------------------------------------------------------------
@@ -417,6 +564,9 @@ class SharpeBacktestEngine:
         if self.portfolio_value.empty:
             self.performance_metrics = pd.DataFrame()
             self.monthly_performance = pd.DataFrame()
+            self.monthly_pnl_pct     = pd.Series(dtype=float)
+            self.pv_peak             = np.empty(0)
+            self.pv_drawdown         = np.empty(0)
             return
 
         # ------------------------------------------------------------
@@ -431,9 +581,11 @@ class SharpeBacktestEngine:
         volatility    = daily_returns.std() * np.sqrt(252)
         sharpe        = (daily_returns.mean() / daily_returns.std()) * np.sqrt(252)
 
-        rolling_max   = self.portfolio_value.cummax()
-        drawdown      = (self.portfolio_value / rolling_max) - 1
-        max_dd        = drawdown.min()
+        # Peak-/Drawdown-Reihe einmal pro Lauf; Kennzahlen und UI lesen daraus
+        pv = self.portfolio_value.to_numpy(dtype=np.float64)
+        self.pv_peak     = np.maximum.accumulate(pv)
+        self.pv_drawdown = pv / self.pv_peak - 1.0
+        max_dd, ui, avg_dd = _drawdown_stats(pv, drawdown=self.pv_drawdown)
 
         trading_costs_pct = self.total_trading_costs / self.start_balance * 100
 
@@ -441,7 +593,7 @@ class SharpeBacktestEngine:
         # 2) Zusätzliche Risiko‑Kennzahlen
         # ------------------------------------------------------------
         # 2‑A) Ulcer Index & UPI
-        ui  = np.sqrt(((drawdown[drawdown < 0] * 100) ** 2).mean())                # Prozent‑Skala
+        # ui kommt bereits auf Prozent‑Skala aus _drawdown_stats
         upi = cagr / (ui / 100) if ui != 0 else np.nan
 
         # 2‑B) Sortino Ratio (Downside‑Vol)
@@ -460,7 +612,6 @@ class SharpeBacktestEngine:
         omega  = pos / neg if neg != 0 else np.nan
 
         # 2‑E) Pain Ratio
-        avg_dd = abs(drawdown[drawdown < 0]).mean()
         pain   = cagr / avg_dd if avg_dd != 0 else np.nan
 
         # ------------------------------------------------------------
@@ -532,3 +683,6 @@ class SharpeBacktestEngine:
             }
         )
 
+        # Bereits nach Datum indiziert (datetime64) – die UI liest nur noch
+        self.monthly_pnl_pct = (monthly_pnl * 100).rename("Monthly PnL (%)").rename_axis("Date")
+
@@ -3,7 +3,7 @@ from __future__ import annotations
 from typing           import Optional
 from datetime         import date
 from sqlmodel         import SQLModel, Field
-from sqlalchemy       import Column, Date, UniqueConstraint
+from sqlalchemy       import Column, Date, Index, UniqueConstraint
 from sqlalchemy.types import BigInteger
 
 class TickerPeriod(SQLModel, table=True):
@@ -41,7 +41,11 @@ class TickerInfo(SQLModel, table=True):
 
 
 class PriceData(SQLModel, table=True):
-    __tablename__ = "price_data"
+    __tablename__  = "price_data"
+    __table_args__ = (
+        # Ticker + Datum: Preisabfragen (ticker IN …, Datumsbereich, ORDER BY date)
+        Index("ix_price_data_ticker_date", "ticker", "date"),
+    )
 
     id: Optional[int] = Field(default=None, primary_key=True)
     ticker: str       = Field(index=True, description="Ticker-Symbol")
@@ -6,6 +6,13 @@ Optuna‑Wrapper für AlphaMachine‑Backtests
 """
 
 from __future__ import annotations
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from multiprocessing.shared_memory import SharedMemory
+
+import numpy as np
 import optuna
 import pandas as pd
 from AlphaMachine_core.engine import SharpeBacktestEngine
@@ -26,20 +33,8 @@ def kpi_objective(weights: dict[str, float], metrics: dict[str, float]) -> float
 # ------------------------------------------------------------
 # 2) Objective‑Funktion  (einzige gültige Version!)
 # ------------------------------------------------------------
-def objective(
-    trial: optuna.Trial,
-    price_df: pd.DataFrame,
-    fixed_kwargs: dict,
-    search_space: dict,
-    kpi_weights: dict[str, float],
-) -> float:
-    """
-    Baut kwargs dynamisch aus `search_space` + `fixed_kwargs`,
-    legt die wichtigsten KPIs als trial.user_attr ab und liefert
-    den zusammengesetzten Score zurück.
-    """
-
-    # ---------- A) Parameter aus dem Suchraum --------------------
+def _suggest_kwargs(trial: optuna.Trial, fixed_kwargs: dict, search_space: dict) -> dict:
+    """Zieht die Parameter aus `search_space` und ergänzt `fixed_kwargs`."""
     kwargs = fixed_kwargs.copy()
 
     for name, spec in search_space.items():
@@ -57,15 +52,22 @@ def objective(
         else:
             raise ValueError(f"Unbekannter Parametertyp '{kind}' für {name}")
 
-    # ---------- B) Backtest ausführen ----------------------------
-    eng = SharpeBacktestEngine(price_df, **kwargs)
+    return kwargs
+
+
+def _backtest_kpis(
+    price_df: pd.DataFrame,
+    kwargs: dict,
+    returns: pd.DataFrame | None = None,
+) -> dict[str, float] | None:
+    """Führt einen Backtest aus und liefert die KPIs als float-dict (None = leer)."""
+    eng = SharpeBacktestEngine(price_df, returns=returns, **kwargs)
     eng.run_with_next_month_allocation()
 
     if eng.performance_metrics.empty:
-        raise optuna.TrialPruned("empty performance metrics")
+        return None
 
-    # ---------- C) KPIs einsammeln -------------------------------
-    pf = (
+    return (
         eng.performance_metrics
            .set_index("Metric")["Value"]
            .str.replace(r"[%\$ ,]", "", regex=True)
@@ -73,15 +75,75 @@ def objective(
            .to_dict()
     )
 
+
+def _set_kpi_attrs(trial: optuna.Trial, pf: dict[str, float]) -> None:
     # → in Optuna speichern, damit sie in trials_dataframe() auftauchen
     trial.set_user_attr("Sharpe",       pf.get("Sharpe Ratio"))
     trial.set_user_attr("CAGR",         pf.get("CAGR (%)"))
     trial.set_user_attr("Ulcer Index",  pf.get("Ulcer Index"))
 
-    # ---------- D) Zielwert zurückgeben --------------------------
+
+def objective(
+    trial: optuna.Trial,
+    price_df: pd.DataFrame,
+    fixed_kwargs: dict,
+    search_space: dict,
+    kpi_weights: dict[str, float],
+    returns: pd.DataFrame | None = None,
+) -> float:
+    """
+    Baut kwargs dynamisch aus `search_space` + `fixed_kwargs`,
+    legt die wichtigsten KPIs als trial.user_attr ab und liefert
+    den zusammengesetzten Score zurück.
+    """
+    # ---------- A) Parameter aus dem Suchraum --------------------
+    kwargs = _suggest_kwargs(trial, fixed_kwargs, search_space)
+
+    # ---------- B) Backtest ausführen + KPIs einsammeln ----------
+    pf = _backtest_kpis(price_df, kwargs, returns)
+    if pf is None:
+        raise optuna.TrialPruned("empty performance metrics")
+
+    _set_kpi_attrs(trial, pf)
+
+    # ---------- C) Zielwert zurückgeben --------------------------
     return kpi_objective(kpi_weights, pf)
 
 
+# ──────────────────────────────────────────────────────────────────────────────
+# Worker‑Prozesse  ➟  Preise/Renditen per Shared Memory (zero‑copy) statt Pickle
+# ──────────────────────────────────────────────────────────────────────────────
+_WORKER_DATA: dict = {}
+
+
+def _to_shared(arr: np.ndarray) -> tuple[SharedMemory, tuple]:
+    """Kopiert `arr` einmal in ein SharedMemory‑Segment; liefert (shm, spec)."""
+    arr = np.ascontiguousarray(arr)
+    shm = SharedMemory(create=True, size=max(arr.nbytes, 1))
+    np.ndarray(arr.shape, arr.dtype, buffer=shm.buf)[:] = arr
+    return shm, (shm.name, arr.shape, arr.dtype.str)
+
+
+def _attach_frame(spec: tuple, index, columns) -> pd.DataFrame:
+    name, shape, dtype = spec
+    # Worker teilen den resource_tracker des Hauptprozesses; dieser
+    # gibt das Segment nach dem Lauf per unlink() frei
+    shm = SharedMemory(name=name)
+    _WORKER_DATA.setdefault("_shm", []).append(shm)   # Mapping am Leben halten
+    values = np.ndarray(shape, np.dtype(dtype), buffer=shm.buf)
+    values.flags.writeable = False
+    return pd.DataFrame(values, index=index, columns=columns, copy=False)
+
+
+def _init_worker(price_spec: tuple, returns_spec: tuple, index, columns) -> None:
+    _WORKER_DATA["price_df"] = _attach_frame(price_spec, index, columns)
+    _WORKER_DATA["returns"] = _attach_frame(returns_spec, index, columns)
+
+
+def _run_single_trial(kwargs: dict) -> dict[str, float] | None:
+    return _backtest_kpis(_WORKER_DATA["price_df"], kwargs, _WORKER_DATA["returns"])
+
+
 # ──────────────────────────────────────────────────────────────────────────────
 # Public Helper  ➟  in Streamlit aufrufen
 # ──────────────────────────────────────────────────────────────────────────────
@@ -92,26 +154,100 @@ def run_optimizer(
     kpi_weights:  dict[str, float],
     n_trials: int = 50,
     timeout:  int | None = None,
+    n_jobs:   int | None = None,
 ):
+    """
+    Startet die Optuna‑Studie. Die Trials laufen per ask/tell parallel in
+    einem ProcessPoolExecutor (`n_jobs` Worker, Default: CPU‑Kerne − 1;
+    negative Werte wie bei Optuna/joblib: −1 = alle Kerne);
+    `n_jobs=1` nutzt den klassischen seriellen `study.optimize`‑Pfad.
+    """
     study = optuna.create_study(
         direction="maximize",
         sampler=optuna.samplers.TPESampler(seed=42),
     )
 
+    # Renditen nur einmal pro Studie berechnen – alle Trials teilen sie
+    returns_df = price_df.pct_change()
+
     # hübscher Progress‑Balken in Streamlit
     import streamlit as st
     bar = st.progress(0.0)
 
-    def _cb(study, trial):       # callback pro Trial
-        bar.progress((trial.number + 1) / n_trials)
+    if n_jobs is None:
+        n_jobs = max(1, (os.cpu_count() or 2) - 1)
+    elif n_jobs < 0:
+        n_jobs = max(1, (os.cpu_count() or 1) + 1 + n_jobs)
+
+    if n_jobs == 1:
+        def _cb(study, trial):       # callback pro Trial
+            bar.progress((trial.number + 1) / n_trials)
+
+        study.optimize(
+            lambda tr: objective(tr, price_df, fixed_kwargs, search_space, kpi_weights, returns_df),
+            n_trials=n_trials,
+            timeout=timeout,
+            callbacks=[_cb],
+            gc_after_trial=True,
+            show_progress_bar=False,
+        )
+        bar.empty()
+        return study
+
+    deadline = time.monotonic() + timeout if timeout else None
+    submitted = done = 0
+    pending = {}
+
+    # Preis‑ und Renditematrix einmal in Shared Memory legen; Worker bauen
+    # daraus nur Views (Index/Spalten sind klein und werden gepickelt)
+    price_shm, price_spec = _to_shared(price_df.to_numpy())
+    ret_shm, ret_spec = _to_shared(returns_df.to_numpy())
+
+    try:
+        # spawn statt fork: der Streamlit-Server ist multithreaded (DB-Pool,
+        # Logging, BLAS) – ein fork könnte von fremden Threads gehaltene Locks
+        # mitkopieren und im Worker deadlocken
+        with ProcessPoolExecutor(
+            max_workers=n_jobs,
+            mp_context=multiprocessing.get_context("spawn"),
+            initializer=_init_worker,
+            initargs=(price_spec, ret_spec, price_df.index, price_df.columns),
+        ) as executor:
+            while pending or submitted < n_trials:
+                # Pipeline voll halten: max. n_jobs Trials gleichzeitig unterwegs
+                while (
+                    submitted < n_trials
+                    and len(pending) < n_jobs
+                    and (deadline is None or time.monotonic() < deadline)
+                ):
+                    trial = study.ask()
+                    kwargs = _suggest_kwargs(trial, fixed_kwargs, search_space)
+                    pending[executor.submit(_run_single_trial, kwargs)] = trial
+                    submitted += 1
+
+                if not pending:
+                    break
+
+                finished, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for fut in finished:
+                    trial = pending.pop(fut)
+                    try:
+                        pf = fut.result()
+                    except Exception as e:
+                        print(f"⚠️ Trial {trial.number} fehlgeschlagen: {e}")
+                        study.tell(trial, state=optuna.trial.TrialState.FAIL)
+                    else:
+                        if pf is None:
+                            study.tell(trial, state=optuna.trial.TrialState.PRUNED)
+                        else:
+                            _set_kpi_attrs(trial, pf)
+                            study.tell(trial, kpi_objective(kpi_weights, pf))
+                    done += 1
+                    bar.progress(min(done / n_trials, 1.0))
+    finally:
+        for shm in (price_shm, ret_shm):
+            shm.close()
+            shm.unlink()
 
-    study.optimize(
-        lambda tr: objective(tr, price_df, fixed_kwargs, search_space, kpi_weights),
-        n_trials=n_trials,
-        timeout=timeout,
-        callbacks=[_cb],
-        gc_after_trial=True,
-        show_progress_bar=False,
-    )
     bar.empty()
     return study
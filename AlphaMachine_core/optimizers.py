@@ -8,6 +8,12 @@ from scipy.spatial.distance import pdist
 from typing import Literal
 
 
+def _sample_cov(x: np.ndarray) -> np.ndarray:
+    """Stichproben-Kovarianz (ddof=1) direkt auf dem ndarray."""
+    xc = x - x.mean(axis=0)
+    return xc.T @ xc / (x.shape[0] - 1)
+
+
 def get_cov_matrix(
     returns: pd.DataFrame,
     method: Literal["ledoit-wolf", "constant-corr", "factor-model"] = "ledoit-wolf",
@@ -19,10 +25,18 @@ def get_cov_matrix(
             lw.covariance_, index=returns.columns, columns=returns.columns
         )
     elif method == "constant-corr":
-        std = returns.std()
-        corr_matrix = returns.corr()
+        x = returns.to_numpy(dtype=float)
+        if np.isnan(x).any():
+            # paarweise NaN-Behandlung nur über pandas
+            std = returns.std().values
+            corr_matrix = returns.corr().values
+        else:
+            cov = _sample_cov(x)
+            std = np.sqrt(np.diag(cov))
+            with np.errstate(divide="ignore", invalid="ignore"):
+                corr_matrix = cov / np.outer(std, std)
         avg_corr = (
-            corr_matrix.values[np.triu_indices_from(corr_matrix.values, 1)]
+            corr_matrix[np.triu_indices_from(corr_matrix, 1)]
         ).mean()
         const_corr = np.full_like(corr_matrix, avg_corr)
         np.fill_diagonal(const_corr, 1.0)
@@ -80,6 +94,25 @@ def get_recursive_bisection(cov):
     return w / w.sum()
 
 
+def _variance_objective(w: np.ndarray, cov: np.ndarray) -> tuple[float, np.ndarray]:
+    """Portfolio-Varianz w'Σw und ihr analytischer Gradient 2Σw."""
+    cw = cov @ w
+    return w @ cw, 2.0 * cw
+
+
+def _neg_sharpe_objective(
+    w: np.ndarray, cov: np.ndarray, mean_returns: np.ndarray
+) -> tuple[float, np.ndarray]:
+    """Negative Sharpe-Ratio (ohne rf) und ihr analytischer Gradient."""
+    cw = cov @ w
+    port_vol = np.sqrt(w @ cw)
+    if not port_vol > 0:
+        return np.inf, np.zeros_like(w)
+    port_return = w @ mean_returns
+    grad = -(mean_returns / port_vol - port_return * cw / port_vol**3)
+    return -port_return / port_vol, grad
+
+
 def optimize_portfolio(
     returns: pd.DataFrame,
     method: Literal["equal", "minvar", "ledoit-wolf", "hrp"] = "ledoit-wolf",
@@ -155,6 +188,7 @@ def optimize_portfolio(
     # Case: Full optimizer weighting
     cov = get_cov_matrix(returns, method=cov_estimator)
     mean_returns = returns.mean().values
+    cov_arr = cov.to_numpy()   # Zielfunktion rechnet auf dem ndarray, nicht auf dem DataFrame
 
     def normalize(w):
         w = np.clip(w, min_weight, max_weight)
@@ -164,11 +198,9 @@ def optimize_portfolio(
 
         def objective(w):
             if method == "minvar":
-                return w.T @ cov @ w
+                return _variance_objective(w, cov_arr)
             elif method == "ledoit-wolf":
-                port_return = w @ mean_returns
-                port_vol = np.sqrt(w.T @ cov @ w)
-                return -port_return / port_vol if port_vol > 0 else np.inf
+                return _neg_sharpe_objective(w, cov_arr, mean_returns)
 
         cons = {"type": "eq", "fun": lambda w: np.sum(w) - 1}
         bounds = [(min_weight, max_weight)] * len(tickers)
@@ -177,7 +209,7 @@ def optimize_portfolio(
         x0 = x0 / x0.sum()        
         
         result = minimize(
-            objective, x0, method="SLSQP", bounds=bounds, constraints=[cons]
+            objective, x0, method="SLSQP", jac=True, bounds=bounds, constraints=[cons]
         )
         weights = result.x if result.success else x0
 
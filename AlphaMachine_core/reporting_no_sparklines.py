@@ -2,18 +2,21 @@ import pandas as pd
 import numpy as np
 import matplotlib.pyplot as plt
 import io
-from openpyxl import load_workbook
+import os
 from openpyxl.drawing.image import Image as XLImage
 from datetime import date
 from scipy.stats import kurtosis, skew
 
 def export_results_to_excel(engine, filepath):
-    """Exportiert die Backtest-Ergebnisse als Excel-Datei (mit Trading-Kosten, Rebalance-Analyse und Next Month Allocation)."""
+    """Exportiert die Backtest-Ergebnisse als Excel-Datei (mit Trading-Kosten, Rebalance-Analyse und Next Month Allocation).
+
+    `filepath` darf ein Pfad oder ein file-like Objekt (z. B. io.BytesIO) sein.
+    """
     try:
         with pd.ExcelWriter(filepath, engine="openpyxl") as writer:
             # … bestehende Blätter …
             if engine.selection_details:
-                pd.DataFrame(engine.selection_details).to_excel(
+                engine.selection_df.to_excel(
                     writer, sheet_name="Selection Details", index=False
                 )
             if engine.missing_months:
@@ -56,10 +59,13 @@ def export_results_to_excel(engine, filepath):
                                  sheet_name='Next Month Allocation',
                                  index=False)
 
-        # Portfolio-Chart ins Excel
-        _add_portfolio_chart(filepath, engine.portfolio_value)
+            # Portfolio-Chart direkt ins offene Workbook (kein Re-Load von Disk)
+            _add_portfolio_chart(writer.book, engine.portfolio_value)
 
-        print(f"✅ Excel-Report gespeichert unter: {filepath}")
+        if isinstance(filepath, (str, os.PathLike)):
+            print(f"✅ Excel-Report gespeichert unter: {filepath}")
+        else:
+            print("✅ Excel-Report im Speicher erstellt.")
         if engine.missing_months:
             print("⚠️ Fehlende Monate:", ", ".join(engine.missing_months))
 
@@ -67,8 +73,8 @@ def export_results_to_excel(engine, filepath):
         print(f"❌ Fehler beim Export: {e}")
 
 
-def _add_portfolio_chart(filepath, portfolio_series):
-    """Fügt ein Liniendiagramm zur Excel-Datei hinzu."""
+def _add_portfolio_chart(wb, portfolio_series):
+    """Fügt ein Liniendiagramm als Sheet "Chart" zum (openpyxl-)Workbook hinzu."""
     try:
         fig, ax = plt.subplots(figsize=(10, 4))
         ax.plot(portfolio_series.index, portfolio_series.values, linewidth=2)
@@ -82,13 +88,12 @@ def _add_portfolio_chart(filepath, portfolio_series):
         fig.savefig(buf, format="png")
         buf.seek(0)
 
-        wb = load_workbook(filepath)
+        plt.close(fig)
+
         ws = wb.create_sheet("Chart")
         img = XLImage(buf)
         img.anchor = "A1"
         ws.add_image(img)
-        wb.save(filepath)
-        buf.close()
     except Exception as e:
         print(f"❌ Fehler beim Hinzufügen des Charts: {e}")
 
@@ -233,17 +238,17 @@ def create_drawdown_sheet(engine, writer, top_n=10):
     for trade_date, row in df.iterrows():
         if not in_drawdown and row["Drawdown"] < 0:
             in_drawdown = True
-            start = date
+            start = trade_date
             peak_val = row["Peak"]
             trough_val = row["Portfolio"]
-            trough = date
+            trough = trade_date
         elif in_drawdown:
             if row["Portfolio"] < trough_val:
                 trough_val = row["Portfolio"]
-                trough = date
+                trough = trade_date
             if row["Portfolio"] >= peak_val:
                 in_drawdown = False
-                end = date
+                end = trade_date
                 periods.append(
                     {
                         "Start": start.date(),
@@ -346,7 +351,7 @@ def create_rebalance_analysis_sheet(engine, writer):
             # Füge einen Spalte für den Zeitabstand hinzu (in Tagen)
             if len(rebalance_df) > 1:
                 rebalance_df["Rebalance Date"] = pd.to_datetime(
-                    rebalance_df["Rebalance Date"]
+                    rebalance_df["Rebalance Date"], format="%Y-%m-%d"
                 )
                 rebalance_df["Days Since Last Rebalance"] = (
                     rebalance_df["Rebalance Date"].diff().dt.days
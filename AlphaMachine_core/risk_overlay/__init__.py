@@ -1,3 +1,3 @@
-from .indicators.base import IndicatorBase, Mode
+from .indicators.base import Indicator, IndicatorBase, Mode, PreparedData
 
-__all__ = ["IndicatorBase", "Mode"]   # ← Ruff erkennt das als legitimen Re-Export
+__all__ = ["Indicator", "IndicatorBase", "Mode", "PreparedData"]   # ← Ruff erkennt das als legitimen Re-Export
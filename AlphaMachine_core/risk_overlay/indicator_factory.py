@@ -1,15 +1,39 @@
 # AlphaMachine_core/risk_overlay/indicator_factory.py
+from functools import lru_cache
 from importlib import import_module
+import copy
 import json
+import os
 
-def load_indicators(config_path: str):
-    cfg = json.load(open(config_path))
+# (modulpfad, klassenname) → Klasse; wird beim ersten Zugriff befüllt
+_CLASS_REGISTRY: dict[tuple[str, str], type] = {}
+
+
+def _resolve_class(path: str, cls_name: str) -> type:
+    key = (path, cls_name)
+    cls = _CLASS_REGISTRY.get(key)
+    if cls is None:
+        cls = getattr(import_module(path), cls_name)
+        _CLASS_REGISTRY[key] = cls
+    return cls
+
+
+@lru_cache(maxsize=16)
+def _load_cached(config_path: str, mtime: float) -> tuple:
+    # mtime ist Teil des Cache-Keys → geänderte Config wird neu geladen
+    with open(config_path) as f:
+        cfg = json.load(f)
     out = []
     for entry in cfg["indicators"]:
-        module = import_module(entry["path"])
-        cls = getattr(module, entry["class"])
+        cls = _resolve_class(entry["path"], entry["class"])
         ind = cls(**entry.get("params", {}))
         ind.mode = entry.get("mode", ind.mode)
         ind.weight = entry.get("weight", 1.0)
         out.append(ind)
-    return out
+    return tuple(out)
+
+
+def load_indicators(config_path: str):
+    prebuilt = _load_cached(config_path, os.path.getmtime(config_path))
+    # Kopien zurückgeben, damit Aufrufer mode/weight ändern dürfen
+    return [copy.copy(ind) for ind in prebuilt]
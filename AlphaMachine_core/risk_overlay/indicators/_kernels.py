@@ -0,0 +1,158 @@
+# AlphaMachine_core/risk_overlay/indicators/_kernels.py
+"""
+Array-Kernels für die Risk-Overlay-Indikatoren (reines NumPy/SciPy).
+"""
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from scipy.signal import lfilter, lfilter_zi
+
+
+@lru_cache(maxsize=64)
+def _ewm_coeffs(alpha: float):
+    """Filterkoeffizienten + Steady-State-Zustand, einmal pro alpha."""
+    b = np.array([alpha])
+    a = np.array([1.0, alpha - 1.0])
+    return b, a, lfilter_zi(b, a)
+
+
+@lru_cache(maxsize=64)
+def _cross_coeffs(a_fast: float, a_slow: float):
+    """Koeffizienten des EMA-Cross-Filters 2. Ordnung, einmal pro Paar."""
+    d_f, d_s = 1.0 - a_fast, 1.0 - a_slow
+    b = np.array([a_fast - a_slow, a_slow - a_fast])
+    a = np.array([1.0, -(d_f + d_s), d_f * d_s])
+    return b, a, lfilter_zi(b, a)
+
+
+def ewm_adjust_false(x: np.ndarray, alpha: float, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Rekursiver EMA wie `Series.ewm(alpha=..., adjust=False).mean()`:
+    s[0] = x[0], s[i] = alpha*x[i] + (1-alpha)*s[i-1].
+
+    Die Rekursion läuft als IIR-Filter in C (lfilter); bei NaNs im Input
+    wird auf pandas zurückgefallen, weil dessen NaN-Gewichtung abweicht.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.size == 0 or np.isnan(x).any():
+        res = pd.Series(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    else:
+        b, a, zi = _ewm_coeffs(float(alpha))
+        res, _ = lfilter(b, a, x, zi=zi * x[0])
+    if out is None:
+        return res
+    out[:] = res
+    return out
+
+
+def ema_cross(x: np.ndarray, a_fast: float, a_slow: float, out: np.ndarray | None = None) -> np.ndarray:
+    """
+    Differenz EMA(fast) - EMA(slow) in einem Durchlauf.
+
+    Beide Rekursionen zusammen ergeben einen IIR-Filter 2. Ordnung:
+    (1 - (df+ds) z⁻¹ + df·ds z⁻²) y = (a_f - a_s)(1 - z⁻¹) x  mit d = 1 - a.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.size == 0 or np.isnan(x).any():
+        res = ewm_adjust_false(x, a_fast) - ewm_adjust_false(x, a_slow)
+    else:
+        b, a, zi = _cross_coeffs(float(a_fast), float(a_slow))
+        res, _ = lfilter(b, a, x, zi=zi * x[0])
+        # Rundungsrauschen (z. B. bei konstantem Kurs) auf exakt 0 setzen,
+        # sonst bläst die Z-Score-Normierung es zu ±1 auf
+        res[np.abs(res) < 1e-12 * np.abs(x).max()] = 0.0
+    if out is None:
+        return res
+    out[:] = res
+    return out
+
+
+def prefix_sums(x: np.ndarray) -> tuple:
+    """
+    Präfixsummen (Summe, Anzahl gültiger Werte, Verschiebung) für
+    `rolling_mean`; einmal berechnet, für beliebige Fensterlängen nutzbar.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    valid = ~np.isnan(x)
+    # Um den ersten Wert verschoben summieren: weniger Auslöschung, und ein
+    # konstanter Kurs ergibt exakt seinen eigenen Mittelwert
+    shift = x[valid][0] if valid.any() else 0.0
+    csum = np.concatenate(([0.0], np.cumsum(np.where(valid, x - shift, 0.0))))
+    ccnt = np.concatenate(([0], np.cumsum(valid)))
+    return csum, ccnt, shift
+
+
+def rolling_mean(x: np.ndarray, window: int, prefix: tuple | None = None) -> np.ndarray:
+    """
+    Gleitender Mittelwert wie `rolling(window, min_periods=1).mean()`
+    über Präfixsummen: O(n), unabhängig von der Fensterlänge. NaNs zählen
+    nicht mit; ein Fenster ganz ohne Werte liefert NaN.
+    """
+    csum, ccnt, shift = prefix if prefix is not None else prefix_sums(x)
+    n = csum.size - 1
+    lo = np.maximum(np.arange(1, n + 1) - window, 0)
+    total = csum[1:] - csum[lo]
+    count = ccnt[1:] - ccnt[lo]
+    with np.errstate(invalid="ignore", divide="ignore"):
+        return np.where(count > 0, total / count + shift, np.nan)
+
+
+def ma_below_streak(
+    close: np.ndarray, ma_period: int, days_below: int, ma: np.ndarray | None = None
+) -> np.ndarray:
+    """
+    1.0, wenn der Kurs an den letzten `days_below` Tagen jeweils unter
+    seinem gleitenden Mittel (min_periods=1) lag, sonst 0.0.
+    Ein bereits berechnetes `ma` kann übergeben werden.
+    """
+    close = np.asarray(close, dtype=np.float64)
+    if ma is None:
+        ma = rolling_mean(close, ma_period)
+    below = close < ma
+    # Branchfreie int32-Serie: Abstand zum letzten Tag über/auf dem MA
+    idx = np.arange(close.size, dtype=np.int32)
+    last_above = np.maximum.accumulate(np.where(below, np.int32(-1), idx))
+    streak = idx - last_above
+    return (streak >= days_below).astype(np.float64)
+
+
+def ewm_adjust_false_2d(x: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    `ewm_adjust_false` für eine (Zeit × Ticker)-Matrix: ein Filteraufruf
+    entlang der Zeitachse für alle Spalten gleichzeitig.
+    """
+    x = np.asarray(x, dtype=np.float64)
+    if x.shape[0] == 0 or np.isnan(x).any():
+        return pd.DataFrame(x).ewm(alpha=alpha, adjust=False).mean().to_numpy()
+    b, a, zi = _ewm_coeffs(float(alpha))
+    res, _ = lfilter(b, a, x, axis=0, zi=zi[:, None] * x[:1])
+    return res
+
+
+def ema_weights(alpha: float, window: int) -> np.ndarray:
+    """
+    Gewichte eines auf `window` Punkte begrenzten EMA (älteste zuerst):
+    [(1-α)^(w-1), α(1-α)^(w-2), …, α(1-α), α] – Summe = 1.
+    """
+    w = alpha * (1.0 - alpha) ** np.arange(window - 1, -1, -1, dtype=np.float64)
+    w[0] = (1.0 - alpha) ** (window - 1)
+    return w
+
+
+def ewm_window(x: np.ndarray, weights: np.ndarray, alpha: float) -> np.ndarray:
+    """
+    Begrenzter EMA entlang Achse 0 (1D oder Zeit × Ticker) als Skalarprodukt
+    jedes Fensters mit `weights` (BLAS-gemv über eine Sliding-View).
+    Die ersten window-1 Werte entsprechen dem rekursiven EMA ab x[0].
+    """
+    x = np.asarray(x, dtype=np.float64)
+    window = weights.size
+    if x.shape[0] < window:
+        return ewm_adjust_false_2d(x, alpha) if x.ndim == 2 else ewm_adjust_false(x, alpha)
+    out = np.empty_like(x)
+    head = x[:window - 1]
+    out[:window - 1] = ewm_adjust_false_2d(head, alpha) if x.ndim == 2 else ewm_adjust_false(head, alpha)
+    view = np.lib.stride_tricks.sliding_window_view(x, window, axis=0)
+    out[window - 1:] = view @ weights
+    return out
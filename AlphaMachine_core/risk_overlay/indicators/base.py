@@ -1,37 +1,223 @@
-from abc import ABC, abstractmethod
+from dataclasses import dataclass, field
 from enum import Enum
+from typing import Protocol
+import threading
 import pandas as pd
 import numpy as np
 
+from ._kernels import prefix_sums, rolling_mean
+
+# Ausgabetyp aller Scores: Z-Scores und 0/1-Signale brauchen keine 15 Stellen
+DTYPE = np.float32
+
 class Mode(str, Enum):
     RISK_OFF = "risk_off"
     RISK_ON  = "risk_on"
     BOTH     = "both"
 
-class IndicatorBase(ABC):
+@dataclass
+class PreparedData:
+    """
+    Einmalig vorbereitete Array-Sicht auf die Input-Daten eines Overlay-Laufs.
+    Spalten werden beim ersten Zugriff konvertiert und danach wiederverwendet;
+    `data["close"]` liefert weiterhin eine Series (DataFrame-kompatibel).
+    """
+
+    index: pd.Index
+    frame: pd.DataFrame | None = None
+    arrays: dict = field(default_factory=dict)
+    derived: dict = field(default_factory=dict, repr=False)
+    _lock: threading.RLock = field(default_factory=threading.RLock, repr=False)
+
+    @classmethod
+    def of(cls, data) -> "PreparedData":
+        if isinstance(data, PreparedData):
+            return data
+        return cls(index=data.index, frame=data)
+
+    @classmethod
+    def from_close(cls, close: np.ndarray) -> "PreparedData":
+        close = np.asarray(close, dtype=np.float64)
+        return cls(index=pd.RangeIndex(close.size), arrays={"close": close})
+
+    def _memo(self, key, compute):
+        # Abgeleitete Größen (Präfixsummen, MAs) teilen sich alle Indikatoren
+        val = self.derived.get(key)
+        if val is None:
+            with self._lock:
+                val = self.derived.get(key)
+                if val is None:
+                    val = compute()
+                    self.derived[key] = val
+        return val
+
+    def prefix(self, name: str = "close") -> tuple:
+        return self._memo(("prefix", name), lambda: prefix_sums(self.column(name)))
+
+    def rolling_mean(self, window: int, name: str = "close") -> np.ndarray:
+        return self._memo(
+            ("rolling_mean", name, window),
+            lambda: rolling_mean(self.column(name), window, self.prefix(name)),
+        )
+
+    def column(self, name: str) -> np.ndarray:
+        arr = self.arrays.get(name)
+        if arr is None:
+            arr = np.ascontiguousarray(self.frame[name].to_numpy(dtype=np.float64))
+            self.arrays[name] = arr
+        return arr
+
+    @property
+    def close_np(self) -> np.ndarray:
+        return self.column("close")
+
+    @property
+    def sentiment_np(self) -> np.ndarray:
+        return self.column("sentiment")
+
+    def __contains__(self, name) -> bool:
+        return name in self.arrays or (self.frame is not None and name in self.frame)
+
+    def __getitem__(self, name: str) -> pd.Series:
+        return pd.Series(self.column(name), index=self.index, name=name)
+
+    def __len__(self) -> int:
+        return len(self.index)
+
+class Indicator(Protocol):
+    """Strukturelle Schnittstelle eines Indikators (für Type-Hints)."""
+
+    mode: Mode
+
+    @property
+    def name(self) -> str: ...
+
+    def calculate(self, data: "pd.DataFrame | PreparedData") -> pd.Series: ...
+
+    def calculate_np(self, close: np.ndarray) -> np.ndarray: ...
+
+    def calculate_prepared(self, view: "PreparedData") -> np.ndarray: ...
+
+
+class _ModeAttr:
+    """
+    `mode` als Descriptor: auf der Klasse der Default (z. B. Mode.RISK_OFF),
+    auf der Instanz der per Config gesetzte Wert (Slot `_mode`).
+    """
+
+    def __get__(self, obj, owner):
+        if obj is None:
+            return owner._default_mode
+        try:
+            return obj._mode
+        except AttributeError:
+            return owner._default_mode
+
+    def __set__(self, obj, value):
+        obj._mode = value
+
+
+class IndicatorBase:
     """
     Grundklasse für alle Risk-Overlay-Indikatoren.
+    Ohne ABC und mit __slots__: schlanke Instanzen, direkter Attributzugriff.
     """
 
-    mode: Mode = Mode.BOTH  # kann via JSON-Konfig überschrieben werden
+    __slots__ = ("_mode", "weight")
+
+    _default_mode: Mode = Mode.BOTH
+    mode = _ModeAttr()          # kann via JSON-Konfig überschrieben werden
+
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # `mode = Mode.X` im Klassenkörper wird zum Default des Descriptors
+        declared = cls.__dict__.get("mode")
+        if declared is not None and not isinstance(declared, _ModeAttr):
+            cls._default_mode = declared
+            cls.mode = _ModeAttr()
 
-    @abstractmethod
-    def calculate(self, data: pd.DataFrame) -> pd.Series:
+    @property
+    def name(self) -> str:
+        """Stabile Kennung, z. B. "EMACrossIndicator(fast=50,slow=200)"."""
+        params = [
+            f"{slot}={getattr(self, slot)}"
+            for klass in type(self).__mro__
+            for slot in klass.__dict__.get("__slots__", ())
+            if not slot.startswith("_") and slot != "weight"
+            and getattr(self, slot, None) is not None
+        ]
+        return f"{type(self).__name__}({','.join(params)})" if params else type(self).__name__
+
+    def calculate(self, data: "pd.DataFrame | PreparedData") -> pd.Series:
         """
         Liefert den (normalisierten) Score pro Datum.
         """
         raise NotImplementedError
 
+    def calculate_np(self, close: np.ndarray) -> np.ndarray:
+        """
+        Array-Variante von `calculate` für Indikatoren auf Basis von "close".
+        Default: Umweg über `calculate` – Subklassen überschreiben das.
+        """
+        return self.calculate(pd.DataFrame({"close": close})).to_numpy(dtype=DTYPE)
+
+    def calculate_prepared(self, view: PreparedData) -> np.ndarray:
+        """
+        Score auf einer vorbereiteten Sicht (RiskOverlay.score). Default:
+        `calculate` – Close-Indikatoren nutzen direkt die geteilten Arrays.
+        """
+        return self.calculate(view).to_numpy(dtype=DTYPE)
+
     def confidence(self, score: pd.Series) -> pd.Series:
         """
         Optional – liefert ein Confidence-Band (0–1). Default = 1.
+        Read-only Broadcast-View statt eines neu befüllten Arrays.
         """
-        return pd.Series(1.0, index=score.index)
+        ones = np.broadcast_to(DTYPE(1.0), (len(score),))
+        return pd.Series(ones, index=score.index, copy=False)
     
     def normalize(self, series: pd.Series) -> pd.Series:
         """Normiert Scores als Z-Score (Standardisierung)"""
-        mu = series.mean()
-        sigma = series.std()
+        return pd.Series(
+            self.normalize_np(series.to_numpy(dtype=np.float64)),
+            index=series.index,
+            name=series.name,
+        )
+
+    @staticmethod
+    def normalize_np(x: np.ndarray) -> np.ndarray:
+        """
+        Z-Score auf einem Array (ddof=1, NaNs werden ignoriert wie in pandas).
+        Akkumuliert in float64, Ausgabe als DTYPE (float32).
+        """
+        x = np.asarray(x, dtype=np.float64)
+        mu = x.mean() if x.size else np.nan
+        if np.isnan(mu):                       # NaNs im Input → nan-Variante
+            n = np.count_nonzero(~np.isnan(x))
+            mu = np.nanmean(x) if n else np.nan
+            out = x - mu
+            ss = np.nansum(out * out)
+        else:
+            n = x.size
+            out = x - mu
+            ss = np.dot(out, out)
+        sigma = np.sqrt(ss / (n - 1)) if n > 1 else np.nan
         if sigma == 0 or np.isnan(sigma):
-            return series * 0  # oder pd.Series(0, index=series.index)
-        return (series - mu) / sigma
+            return np.multiply(x, 0, dtype=DTYPE)   # NaNs bleiben NaN
+        return np.multiply(out, 1.0 / sigma, dtype=DTYPE)
+
+    @staticmethod
+    def normalize_matrix(x: np.ndarray) -> np.ndarray:
+        """
+        Spaltenweiser Z-Score für eine (Zeit × Ticker)-Matrix, gleiche
+        Semantik wie `normalize_np` je Spalte.
+        """
+        x = np.asarray(x, dtype=np.float64)
+        n = np.count_nonzero(~np.isnan(x), axis=0)
+        with np.errstate(invalid="ignore", divide="ignore"):
+            mu = np.nansum(x, axis=0) / n
+            out = x - mu
+            sigma = np.sqrt(np.nansum(out * out, axis=0) / (n - 1))
+            bad = (n < 2) | (sigma == 0) | np.isnan(sigma)
+            scale = np.where(bad, 0.0, 1.0 / sigma)   # degeneriert → x*0
+        return np.multiply(out, scale, dtype=DTYPE)
@@ -1,14 +1,40 @@
-from .base import IndicatorBase, Mode
+from .base import IndicatorBase, Mode, PreparedData
+from ._kernels import ema_weights, ewm_adjust_false, ewm_adjust_false_2d, ewm_window
+import numpy as np
 import pandas as pd
 
 class EMAIndicator(IndicatorBase):
     """Exponentieller Gleitender Durchschnitt – liefert positi­ven Score, wenn Kurs > EMA."""
     mode = Mode.BOTH      # via JSON umstellbar
+    __slots__ = ("period", "window", "_w")
 
-    def __init__(self, period: int = 50):
+    def __init__(self, period: int = 50, window: int | None = None):
         self.period = period
+        # Optional: EMA nur über die letzten `window` Kurse (Gewichte einmalig)
+        self.window = window
+        self._w = ema_weights(2.0 / (period + 1), window) if window else None
 
-    def calculate(self, data: pd.DataFrame) -> pd.Series:
-        ema = data["close"].ewm(span=self.period, adjust=False).mean()
-        score = (data["close"] / ema) - 1.0          # >0 ⇒ bullish
-        return self.normalize(score)
+    def _ema(self, close: np.ndarray) -> np.ndarray:
+        alpha = 2.0 / (self.period + 1)
+        if self._w is not None:
+            return ewm_window(close, self._w, alpha)
+        if close.ndim == 2:
+            return ewm_adjust_false_2d(close, alpha)
+        return ewm_adjust_false(close, alpha)
+
+    def calculate(self, data) -> pd.Series:
+        view = PreparedData.of(data)
+        return pd.Series(self.calculate_np(view.close_np), index=view.index)
+
+    def calculate_prepared(self, view: PreparedData) -> np.ndarray:
+        return self.calculate_np(view.close_np)
+
+    def calculate_np(self, close: np.ndarray) -> np.ndarray:
+        ema = self._ema(close)
+        score = (close / ema) - 1.0                  # >0 ⇒ bullish
+        return self.normalize_np(score)
+
+    def calculate_matrix(self, close2d: np.ndarray) -> np.ndarray:
+        """Score für viele Ticker auf einmal (Spalten = Ticker)."""
+        ema = self._ema(np.asarray(close2d, dtype=np.float64))
+        return self.normalize_matrix((close2d / ema) - 1.0)
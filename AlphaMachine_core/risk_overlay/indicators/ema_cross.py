@@ -1,18 +1,26 @@
 # AlphaMachine_core/risk_overlay/indicators/ema_cross.py
-from .base import IndicatorBase, Mode
+from .base import IndicatorBase, Mode, PreparedData
+from ._kernels import ema_cross
+import numpy as np
 import pandas as pd
 
 class EMACrossIndicator(IndicatorBase):
     """RiskOn, wenn EMA fast / stark > EMA langsam; sonst RiskOff."""
     mode = Mode.BOTH
+    __slots__ = ("fast", "slow")
 
     def __init__(self, fast: int = 50, slow: int = 200):
         self.fast = fast
         self.slow = slow
 
-    def calculate(self, data: pd.DataFrame) -> pd.Series:
-        ema_fast = data["close"].ewm(span=self.fast, adjust=False).mean()
-        ema_slow = data["close"].ewm(span=self.slow, adjust=False).mean()
+    def calculate(self, data) -> pd.Series:
+        view = PreparedData.of(data)
+        return pd.Series(self.calculate_np(view.close_np), index=view.index)
+
+    def calculate_prepared(self, view: PreparedData) -> np.ndarray:
+        return self.calculate_np(view.close_np)
+
+    def calculate_np(self, close: np.ndarray) -> np.ndarray:
         # Score: >0 bullish (RiskOn), <0 bearish (RiskOff)
-        score = ema_fast - ema_slow
-        return self.normalize(score)
+        score = ema_cross(close, 2.0 / (self.fast + 1), 2.0 / (self.slow + 1))
+        return self.normalize_np(score)
@@ -1,18 +1,27 @@
 # AlphaMachine_core/risk_overlay/indicators/ma200.py
-from .base import IndicatorBase, Mode
+from .base import DTYPE, IndicatorBase, Mode, PreparedData
+from ._kernels import ma_below_streak
+import numpy as np
 import pandas as pd
 
 class MA200CloseIndicator(IndicatorBase):
     """RiskOff: Preis schließt 3 Tage unter MA200."""
     mode = Mode.RISK_OFF
+    __slots__ = ("ma_period", "days_below")
 
     def __init__(self, ma_period: int = 200, days_below: int = 3):
         self.ma_period = ma_period
         self.days_below = days_below
 
-    def calculate(self, data: pd.DataFrame) -> pd.Series:
-        ma = data["close"].rolling(window=self.ma_period, min_periods=1).mean()
-        below = data["close"] < ma
-        signal = below.rolling(window=self.days_below).sum() == self.days_below
+    def calculate(self, data) -> pd.Series:
+        view = PreparedData.of(data)
+        return pd.Series(self.calculate_prepared(view), index=view.index)
+
+    def calculate_np(self, close: np.ndarray) -> np.ndarray:
+        return self.calculate_prepared(PreparedData.from_close(close))
+
+    def calculate_prepared(self, view: PreparedData) -> np.ndarray:
+        ma = view.rolling_mean(self.ma_period)      # geteilte Präfixsummen
+        signal = ma_below_streak(view.close_np, self.ma_period, self.days_below, ma=ma)
         # Score: 1 = RiskOff aktiv, 0 = nicht aktiv
-        return signal.astype(float)
+        return signal.astype(DTYPE)
@@ -1,15 +1,61 @@
 # AlphaMachine_core/risk_overlay/indicators/sentiment.py
-from .base import IndicatorBase, Mode
+from .base import DTYPE, IndicatorBase, Mode, PreparedData
+import numpy as np
 import pandas as pd
 
 class SentimentZScoreIndicator(IndicatorBase):
     """RiskOn-Indikator: sentiment column, als Z-Score normalisiert."""
     mode = Mode.RISK_ON
+    __slots__ = ("column", "_count", "_mean", "_m2")
 
     def __init__(self, column: str = "sentiment"):
         self.column = column
+        self.reset()
 
-    def calculate(self, data: pd.DataFrame) -> pd.Series:
+    def calculate(self, data) -> pd.Series:
         # Erwartet, dass data[self.column] vorhanden ist!
-        score = data[self.column]
-        return self.normalize(score)
+        view = PreparedData.of(data)
+        return pd.Series(self.calculate_prepared(view), index=view.index)
+
+    def calculate_prepared(self, view: PreparedData) -> np.ndarray:
+        return self.normalize_np(view.column(self.column))
+
+    # ------------------------------------------------------------
+    # Streaming-Modus (Welford): O(1) pro neuem Wert statt Neuberechnung
+    # ------------------------------------------------------------
+    def reset(self, history=None) -> None:
+        """Setzt den laufenden Zustand zurück; optional mit Historie vorbelegt."""
+        self._count = 0
+        self._mean = 0.0
+        self._m2 = 0.0
+        if history is not None:
+            self._update(np.asarray(history, dtype=np.float64))
+
+    def _update(self, x: np.ndarray) -> None:
+        x = x[~np.isnan(x)]
+        if x.size == 0:
+            return
+        # Chan/Welford-Merge des Blocks in den laufenden Zustand
+        n_b = x.size
+        mean_b = x.mean()
+        m2_b = np.dot(x - mean_b, x - mean_b)
+        n = self._count + n_b
+        delta = mean_b - self._mean
+        self._mean += delta * n_b / n
+        self._m2 += m2_b + delta * delta * self._count * n_b / n
+        self._count = n
+
+    def calculate_incremental(self, new_x):
+        """
+        Nimmt neue Sentiment-Werte (Skalar oder Array) in den Zustand auf und
+        liefert ihren Z-Score gegen den aktualisierten Mittelwert/Std (ddof=1).
+        """
+        x = np.atleast_1d(np.asarray(new_x, dtype=np.float64))
+        self._update(x)
+        sigma = np.sqrt(self._m2 / (self._count - 1)) if self._count > 1 else 0.0
+        if sigma == 0:
+            z = x * 0
+        else:
+            z = (x - self._mean) / sigma
+        z = z.astype(DTYPE)
+        return z[0] if np.ndim(new_x) == 0 else z
@@ -1,15 +1,24 @@
 # AlphaMachine_core/risk_overlay/indicators/sma.py
-from .base import IndicatorBase, Mode
+from .base import IndicatorBase, Mode, PreparedData
+import numpy as np
 import pandas as pd
 
 class SMAIndicator(IndicatorBase):
     """Klassischer Simple Moving Average Indikator."""
     mode = Mode.BOTH
+    __slots__ = ("period",)
 
     def __init__(self, period: int = 50):
         self.period = period
 
-    def calculate(self, data: pd.DataFrame) -> pd.Series:
-        sma = data["close"].rolling(window=self.period, min_periods=1).mean()
-        score = (data["close"] / sma) - 1.0         # >0 ⇒ bullish
-        return self.normalize(score)
+    def calculate(self, data) -> pd.Series:
+        view = PreparedData.of(data)
+        return pd.Series(self.calculate_prepared(view), index=view.index)
+
+    def calculate_np(self, close: np.ndarray) -> np.ndarray:
+        return self.calculate_prepared(PreparedData.from_close(close))
+
+    def calculate_prepared(self, view: PreparedData) -> np.ndarray:
+        sma = view.rolling_mean(self.period)        # geteilte Präfixsummen, O(n)
+        score = (view.close_np / sma) - 1.0         # >0 ⇒ bullish
+        return self.normalize_np(score)
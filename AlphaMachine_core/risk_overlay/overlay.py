@@ -1,20 +1,90 @@
-from typing import Dict, List
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Tuple
+import numpy as np
 import pandas as pd
 
+from .indicators.base import DTYPE, Indicator, PreparedData
+
+# Modulweiter Pool: die Kernels (NumPy/SciPy) geben das GIL frei, Threads
+# werden nur einmal pro Prozess erzeugt
+_MAX_WORKERS = 8
+_EXECUTOR: ThreadPoolExecutor | None = None
+
+
+def _executor() -> ThreadPoolExecutor:
+    global _EXECUTOR
+    if _EXECUTOR is None:
+        _EXECUTOR = ThreadPoolExecutor(
+            max_workers=_MAX_WORKERS, thread_name_prefix="risk-overlay"
+        )
+    return _EXECUTOR
+
+def to_frame(scores: np.ndarray, names: List[str], index: pd.Index) -> pd.DataFrame:
+    """DataFrame-Sicht auf das Ergebnis von `RiskOverlay.score` (UI/Export)."""
+    return pd.DataFrame(scores, index=index, columns=names, copy=False)
+
+
 class RiskOverlay:
     """
     Aggregiert Risk-On/Off-Signale zu einer Ziel-Aktienquote
     und passt die Orderliste an.
     """
 
-    def __init__(self, indicators: List):
+    def __init__(self, indicators: List[Indicator]):
         self.indicators = indicators
 
-    def score(self, data: pd.DataFrame) -> pd.DataFrame:
-        # getrennte Aggregation
-        scores = {ind: ind.calculate(data) for ind in self.indicators}
+    @staticmethod
+    def _prepare(data) -> PreparedData:
+        """
+        Baut die Array-Sicht genau einmal; alle Indikatoren teilen sich die
+        konvertierten Spalten (insb. den float64-Close-Puffer).
+        """
+        return PreparedData.of(data)
+
+    def score(self, data) -> Tuple[np.ndarray, List[str], pd.Index]:
+        """
+        Liefert (scores, names, index): scores ist ein float32-Array der Form
+        (n_zeit, n_indikatoren), Spalte j gehört zu names[j]. Ein DataFrame
+        entsteht erst bei Bedarf über `to_frame`.
+        """
+        view = self._prepare(data)
+        if "close" in view:
+            # geteilten Close-Puffer vor dem Thread-Fan-out materialisieren
+            _ = view.close_np
+
+        # Spaltenweise (F-Order): jede Indikator-Spalte liegt zusammenhängend
+        scores = np.empty((len(view), len(self.indicators)), dtype=DTYPE, order="F")
+
+        def _one(j_ind):
+            j, ind = j_ind
+            scores[:, j] = ind.calculate_prepared(view)
+
+        # getrennte Aggregation – parallel je Indikator
+        if len(self.indicators) > 1:
+            list(_executor().map(_one, enumerate(self.indicators)))
+        else:
+            for j_ind in enumerate(self.indicators):
+                _one(j_ind)
         # TODO: Score-Normalisierung & Gewichtung
-        return pd.DataFrame(scores)
+        return scores, [ind.name for ind in self.indicators], view.index
+
+    def score_matrix(self, prices: pd.DataFrame) -> Dict:
+        """
+        Scores für ein Kurs-Panel (Spalten = Ticker). Indikatoren mit
+        `calculate_matrix` rechnen alle Ticker in einem Aufruf, die übrigen
+        Spalte für Spalte über `calculate_np`.
+        """
+        close2d = np.ascontiguousarray(prices.to_numpy(dtype=np.float64))
+        out = {}
+        for ind in self.indicators:
+            if hasattr(ind, "calculate_matrix"):
+                arr = ind.calculate_matrix(close2d)
+            else:
+                arr = np.column_stack(
+                    [ind.calculate_np(close2d[:, j]) for j in range(close2d.shape[1])]
+                )
+            out[ind] = pd.DataFrame(arr, index=prices.index, columns=prices.columns)
+        return out
 
     def apply(self, date, base_orders: Dict) -> Dict:
         """
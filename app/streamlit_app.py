@@ -1,11 +1,14 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
 from pandas.tseries.holiday import USFederalHolidayCalendar
-from pandas.tseries.offsets import CustomBusinessDay
 import datetime as dt
 from pandas.tseries.offsets import BDay
-import tempfile
-import os
+import io
+import calendar
+import hashlib
+import hmac
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from sqlmodel import select
 import re
 import plotly.graph_objects as go
@@ -30,7 +33,30 @@ from AlphaMachine_core.config import (
     FORCE_EQUAL_WEIGHT as CFG_FORCE_EQ,
 )
 
-init_db() 
+# Sidebar-Optionen + Default-Index einmal beim Import statt bei jedem Rerun
+_OPT_METHODS  = ("ledoit-wolf", "minvar", "hrp")
+_COV_ESTS     = ("ledoit-wolf", "constant-corr", "factor-model")
+_OPT_MODES    = ("select-then-optimize", "optimize-subset")
+_REBAL_FREQS  = ("weekly", "monthly", "custom")
+_OPT_IDX      = _OPT_METHODS.index(CFG_OPT_METHOD)
+_COV_IDX      = _COV_ESTS.index(CFG_COV_EST)
+_MODE_IDX     = _OPT_MODES.index(CFG_OPT_MODE)
+_REBAL_IDX    = _REBAL_FREQS.index(CFG_REBAL_FREQ)
+
+@st.cache_resource(show_spinner=False)
+def _init_db_once():
+    # create_all() prüft bei jedem Aufruf das Schema → nur einmal pro Prozess
+    init_db()
+    return True
+
+
+@st.cache_resource(show_spinner=False)
+def get_dm():
+    """Ein StockDataManager pro Prozess (zustandslos, DB-Engine ist global)."""
+    return StockDataManager()
+
+
+_init_db_once()
 
 # -----------------------------------------------------------------------------
 # 1) Page-Config
@@ -40,10 +66,14 @@ st.set_page_config("AlphaMachine", layout="wide")
 # -----------------------------------------------------------------------------
 # 2) Passwort-Gate
 # -----------------------------------------------------------------------------
-pwd = st.sidebar.text_input("Passwort", type="password")
-if pwd != st.secrets.get("APP_PW", ""):
-    st.warning("🔒 Bitte korrektes Passwort eingeben.")
-    st.stop()
+# Einmal pro Session prüfen (konstante Laufzeit), danach keine
+# secrets-Abfrage mehr bei jedem Rerun
+if not st.session_state.get("auth_ok"):
+    pwd = st.sidebar.text_input("Passwort", type="password")
+    if not hmac.compare_digest(pwd.encode(), st.secrets.get("APP_PW", "").encode()):
+        st.warning("🔒 Bitte korrektes Passwort eingeben.")
+        st.stop()
+    st.session_state["auth_ok"] = True
 
 # -----------------------------------------------------------------------------
 # 3) Navigation-Switcher
@@ -61,22 +91,166 @@ def load_csv(file):
 # -----------------------------------------------------------------------------
 # Load Prices
 # -----------------------------------------------------------------------------
-def load_price_df(month, sources, start_date, end_date):
-    dm = StockDataManager()
-    tickers = dm.get_tickers_for(month, sources)
-    raw = dm.get_price_data(
-        tickers,
-        start_date.strftime("%Y-%m-%d"),
-        end_date.strftime("%Y-%m-%d")
-    )
-    if not raw:
+@st.cache_data(ttl=3600, show_spinner=False)
+def _load_price_matrix(tickers_tuple, start_iso, end_iso):
+    """
+    Lädt die Schlusskurse für (tickers, start, end) und pivotiert sie zu
+    einer Date × Ticker-Matrix. Über Reruns hinweg gecacht – der Key besteht
+    nur aus hashbaren Primitiven (sortiertes Ticker-Tuple + ISO-Daten).
+    """
+    long_df = get_dm().get_price_frame(list(tickers_tuple), start_iso, end_iso)
+    if long_df.empty:
         return pd.DataFrame()
 
-    return (
-        pd.DataFrame([r.model_dump() for r in raw])
-          .assign(date=lambda d: pd.to_datetime(d["trade_date"]))
-          .pivot(index="date", columns="ticker", values="close")
-          .sort_index()
+    # unstack auf kategorischem Ticker statt pivot: Integer-Codes statt Hashing
+    close = long_df.set_index(["trade_date", "ticker"])["close"]
+    price_df = close.unstack("ticker").sort_index().rename_axis(index="date")
+    price_df.columns = price_df.columns.astype(str)
+    return price_df
+
+
+# -----------------------------------------------------------------------------
+# Gecachte DB-Lookups (ändern sich nur über die Data-Mgmt-Seite)
+# -----------------------------------------------------------------------------
+@st.cache_data(ttl=600, show_spinner=False)
+def _distinct_months():
+    return get_dm().get_periods_distinct_months()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _tickers_for(month, sources_tuple):
+    return get_dm().get_tickers_for(month, list(sources_tuple))
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _existing_sources():
+    return list(get_dm().get_sources_distinct())
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _period_months_and_sources():
+    """(Monate, Quellen) aller TickerPeriod-Einträge für die View/Delete-Auswahl."""
+    # DISTINCT auf DB-Seite statt alle Zeilen zu holen und in Python zu deduplizieren
+    return sorted(_distinct_months()), sorted(_existing_sources())
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _periods_frame(month, source):
+    """TickerPeriod-Zeilen (id, ticker, start/end, source) für Monat + Quelle."""
+    return get_dm().get_periods_frame(month, source)
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _ticker_info_frame():
+    """TickerInfo als fertiges DataFrame (kein vars()-Umbau pro Rerun)."""
+    return get_dm().get_ticker_info_frame()
+
+
+@st.cache_data(ttl=600, show_spinner=False)
+def _ticker_date_ranges():
+    """Erster/letzter Preistag je Ticker (einmal gruppiert statt Masken-Scan pro Rerun)."""
+    dfi = _ticker_info_frame()
+    if dfi.empty:
+        return pd.DataFrame(columns=["actual_start_date", "actual_end_date"])
+    return dfi.groupby("ticker", sort=False).agg(
+        actual_start_date=("actual_start_date", "min"),
+        actual_end_date=("actual_end_date", "max"),
+    )
+
+
+def _clear_lookup_caches():
+    _distinct_months.clear()
+    _tickers_for.clear()
+    _existing_sources.clear()
+    _period_months_and_sources.clear()
+    _periods_frame.clear()
+    _ticker_info_frame.clear()
+    _ticker_date_ranges.clear()
+
+
+@st.cache_data(ttl=3600, max_entries=32, show_spinner="📂 Lade Preise…")
+def _load_bday_prices(tickers_tuple, start_iso, end_iso):
+    """
+    Preis-Matrix auf die volle Business-Day-Achse gebracht, forward-filled
+    und als float32 – das fertige Engine-Input, damit Widget-Reruns weder
+    reindex/ffill noch den Downcast wiederholen.
+    """
+    price_df = _load_price_matrix(tickers_tuple, start_iso, end_iso)
+    if price_df.empty:
+        return price_df
+
+    # komplette Business-Day-Range, fehlende Kurse aus dem letzten bekannten
+    # Kurs ziehen (kein bfill). float32 halbiert die Bandbreite für
+    # Returns/Kovarianz; der Portfolio-Wert im Engine bleibt float64.
+    full_idx = pd.date_range(start_iso, end_iso, freq=BDay())
+    return price_df.reindex(full_idx).ffill().astype(np.float32, copy=False)
+
+
+@st.cache_data(ttl=3600, show_spinner=False)
+def _us_bdays(start_iso, end_iso):
+    """US-Handelstage (Mo–Fr ohne Federal Holidays) als datetime64[D]-Array."""
+    holidays = USFederalHolidayCalendar().holidays(start_iso, end_iso)
+    days = np.arange(
+        np.datetime64(start_iso, "D"), np.datetime64(end_iso, "D") + 1, dtype="datetime64[D]"
+    )
+    return days[np.is_busday(days, holidays=holidays.to_numpy(dtype="datetime64[D]"))]
+
+
+_CHART_MAX_BARS    = 1500
+_CHART_TARGET_BARS = 1000
+
+
+@st.cache_data(ttl=3600, max_entries=16, show_spinner=False)
+def _price_chart(ticker, start_iso, end_iso):
+    """
+    Candlestick-Figure + Liste fehlender Handelstage für (ticker, start, end).
+    Gecacht, damit Reruns durch andere Widgets weder DB noch Plotly anfassen.
+    Liefert (None, []) wenn im Zeitraum keine Preise vorliegen.
+    """
+    # OHLCV spaltenweise direkt aus dem Cursor (kein dict pro PriceData-Record)
+    pdf = get_dm().get_price_frame(
+        [ticker], start_iso, end_iso, columns=("open", "high", "low", "close", "volume"),
+    )
+    if pdf.empty:
+        return None, []
+
+    # bereits per ORDER BY date sortiert geliefert
+    pdf = pdf.set_index("trade_date").rename_axis(index="date")
+
+    # lange Historien auf ≈ _CHART_MAX_BARS OHLC-Kerzen verdichten (kleineres
+    # Figure-JSON über den Websocket, schnelleres Rendering im Browser)
+    # Buckets aus je `step` aufeinanderfolgenden Handelstagen (nicht Kalendertagen:
+    # keine leeren Wochenend-/Feiertags-Buckets), datiert auf den ersten Tag
+    bars = pdf
+    if len(pdf) > _CHART_MAX_BARS:
+        step = -(-len(pdf) // _CHART_TARGET_BARS)
+        bars = (
+            pdf.groupby(np.arange(len(pdf)) // step)
+               .agg({"open": "first", "high": "max", "low": "min", "close": "last", "volume": "sum"})
+               .set_axis(pdf.index[::step])
+        )
+
+    fig = go.Figure(data=[go.Candlestick(
+        x=bars.index, open=bars["open"], high=bars["high"],
+        low=bars["low"], close=bars["close"], name=ticker
+    )])
+    # ohne Rangeslider: der zeichnet sonst alle Kerzen ein zweites Mal (Mini-Chart)
+    fig.update_layout(
+        title=f"Candlestick for {ticker}", xaxis_title="Date", yaxis_title="Price",
+        xaxis_rangeslider_visible=False,
+    )
+
+    full_range = _us_bdays(start_iso, end_iso)
+    missing = np.setdiff1d(full_range, pdf.index.to_numpy(dtype="datetime64[D]"))
+    return fig, np.datetime_as_string(missing, unit="D").tolist()
+
+
+def load_price_df(month, sources, start_date, end_date):
+    tickers = _tickers_for(month, tuple(sorted(sources)))
+    return _load_bday_prices(
+        tuple(sorted(tickers)),
+        start_date.isoformat(),
+        end_date.isoformat(),
     )
 
 
@@ -86,108 +260,114 @@ def load_price_df(month, sources, start_date, end_date):
 # =============================================================================
 def show_backtester_ui():
     st.sidebar.header("📊 Backtest-Parameter")
-    dm = StockDataManager()
-
-    # — 0) Backtest-Periode festlegen
-    col1, col2 = st.sidebar.columns(2)
-    start_date = col1.date_input(
-        "Backtest-Startdatum",
-        value=dt.date.today() - dt.timedelta(days=5*365),
-        max_value=dt.date.today()
-    )
-    end_date = col2.date_input(
-        "Backtest-Enddatum",
-        value=dt.date.today(),
-        min_value=start_date
-    )
-    # Jetzt, wo beide existieren, validieren
-    if start_date >= end_date:
-        st.sidebar.error("Startdatum muss vor dem Enddatum liegen.")
-        return
 
-    # — 1) Quellen-Auswahl (DB + Defaults) —
-    with get_session() as session:
-        existing = session.exec(select(TickerPeriod.source)).all()
-    defaults = ["Topweights","TR20"]
-    sources = st.sidebar.multiselect(
-        "Datenquellen auswählen",
-        options=sorted(set(existing + defaults)),
-        default=["Topweights"]
-    )
+    # Alle Parameter in einem Formular: Änderungen lösen keinen Rerun aus,
+    # erst die Start-Buttons schicken alles gesammelt ab
+    with st.sidebar.form("bt_params"):
+        # — 0) Backtest-Periode festlegen
+        col1, col2 = st.columns(2)
+        start_date = col1.date_input(
+            "Backtest-Startdatum",
+            value=dt.date.today() - dt.timedelta(days=5*365),
+            max_value=dt.date.today()
+        )
+        end_date = col2.date_input(
+            "Backtest-Enddatum",
+            value=dt.date.today(),
+            min_value=start_date
+        )
 
-    # — 2) Monat wählen —
-    months = dm.get_periods_distinct_months()
-    month  = st.sidebar.selectbox("Periode wählen (YYYY-MM)", months)
+        # — 1) Quellen-Auswahl (DB + Defaults) —
+        existing = _existing_sources()
+        defaults = ["Topweights","TR20"]
+        sources = st.multiselect(
+            "Datenquellen auswählen",
+            options=sorted(set(existing + defaults)),
+            default=["Topweights"]
+        )
 
-    # — 3) Modus: statisch vs. dynamisch —
-    mode = st.sidebar.radio(
-        "Ticker-Universe",
-        ["statisch (gesamte Periode)", "dynamisch (monatlich)"]
-    )
+        # — 2) Monat wählen —
+        months = _distinct_months()
+        month  = st.selectbox("Periode wählen (YYYY-MM)", months)
 
-    # — 4) Lookback Days (Backtest-Fenster) —
-    window_days = st.sidebar.slider(
-        "Lookback Days", 
-        min_value=50,
-        max_value=500,
-        value=CFG_WINDOW,   # comes from your config
-        step=10
-    )
+        # — 3) Modus: statisch vs. dynamisch —
+        mode = st.radio(
+            "Ticker-Universe",
+            ["statisch (gesamte Periode)", "dynamisch (monatlich)"]
+        )
 
-    # — 5) Portfolio- & Optimierungs-Parameter —
-    start_balance = st.sidebar.number_input("Startkapital", 10_000, 1_000_000, 100_000, 1_000)
-    num_stocks    = st.sidebar.slider("Aktien pro Portfolio", 5, 50, 20)
-    opt_method    = st.sidebar.selectbox(
-        "Optimierer", ["ledoit-wolf","minvar","hrp"],
-        index=["ledoit-wolf","minvar","hrp"].index(CFG_OPT_METHOD)
-    )
-    cov_estimator = st.sidebar.selectbox(
-        "Kovarianzschätzer", ["ledoit-wolf","constant-corr","factor-model"],
-        index=["ledoit-wolf","constant-corr","factor-model"].index(CFG_COV_EST)
-    )
-    opt_mode      = st.sidebar.selectbox(
-        "Optimierungsmodus", ["select-then-optimize","optimize-subset"],
-        index=["select-then-optimize","optimize-subset"].index(CFG_OPT_MODE)
-    )
-    rebalance_freq= st.sidebar.selectbox(
-        "Rebalance", ["weekly","monthly","custom"],
-        index=["weekly","monthly","custom"].index(CFG_REBAL_FREQ)
-    )
-    custom_months = (
-        st.sidebar.slider("Monate zwischen Rebalances", 1, 12, CFG_CUSTOM_REBAL)
-        if rebalance_freq=="custom" else 1
-    )
+        # — 4) Lookback Days (Backtest-Fenster) —
+        window_days = st.slider(
+            "Lookback Days", 
+            min_value=50,
+            max_value=500,
+            value=CFG_WINDOW,   # comes from your config
+            step=10
+        )
 
-    # — 6) Gewicht-Constraints —
-    min_w    = st.sidebar.slider("Min Weight (%)", 0.0, 5.0, CFG_MIN_W*100, 0.5) / 100.0
-    max_w    = st.sidebar.slider("Max Weight (%)", 5.0, 50.0, CFG_MAX_W*100, 1.0) / 100.0
-    force_eq = st.sidebar.checkbox("Force Equal Weight", CFG_FORCE_EQ)
-
-    # — 7) Trading-Kosten —
-    st.sidebar.subheader("Trading-Kosten")
-    enable_tc  = st.sidebar.checkbox("Kosten aktiv", CFG_ENABLE_TC)
-    fixed_cost = st.sidebar.number_input("Fixe Kosten pro Trade", 0.0, 100.0, CFG_FIXED_COST)
-    var_cost   = st.sidebar.number_input("Variable Kosten (%)", 0.0, 1.0, CFG_VAR_COST*100) / 100.0
-
-    # ### OPTIMIZER START – Sidebar‑Widgets  ###
-    st.sidebar.markdown("---")
-    st.sidebar.header("🚀 Optimizer")
-
-    _kpi_weights = {
-        "Sharpe Ratio": st.sidebar.slider("Sharpe‑Gewicht", 0.0, 3.0, 1.0, 0.1),
-        "Ulcer Index":  -st.sidebar.slider("Ulcer‑Gewicht",  0.0, 3.0, 1.0, 0.1),
-        "CAGR (%)":     st.sidebar.slider("CAGR‑Gewicht",   0.0, 3.0, 1.0, 0.1),
-    }
+        # — 5) Portfolio- & Optimierungs-Parameter —
+        start_balance = st.number_input("Startkapital", 10_000, 1_000_000, 100_000, 1_000)
+        num_stocks    = st.slider("Aktien pro Portfolio", 5, 50, 20)
+        opt_method    = st.selectbox(
+            "Optimierer", _OPT_METHODS, index=_OPT_IDX
+        )
+        cov_estimator = st.selectbox(
+            "Kovarianzschätzer", _COV_ESTS, index=_COV_IDX
+        )
+        opt_mode      = st.selectbox(
+            "Optimierungsmodus", _OPT_MODES, index=_MODE_IDX
+        )
+        rebalance_freq= st.selectbox(
+            "Rebalance", _REBAL_FREQS, index=_REBAL_IDX
+        )
+        # im Formular gibt es vor dem Absenden keinen Rerun → Slider immer zeigen
+        custom_slider = st.slider(
+            "Monate zwischen Rebalances (nur 'custom')", 1, 12, CFG_CUSTOM_REBAL
+        )
+
+        # — 6) Gewicht-Constraints —
+        min_w    = st.slider("Min Weight (%)", 0.0, 5.0, CFG_MIN_W*100, 0.5) / 100.0
+        max_w    = st.slider("Max Weight (%)", 5.0, 50.0, CFG_MAX_W*100, 1.0) / 100.0
+        force_eq = st.checkbox("Force Equal Weight", CFG_FORCE_EQ)
+
+        # — 7) Trading-Kosten —
+        st.subheader("Trading-Kosten")
+        enable_tc  = st.checkbox("Kosten aktiv", CFG_ENABLE_TC)
+        fixed_cost = st.number_input("Fixe Kosten pro Trade", 0.0, 100.0, CFG_FIXED_COST)
+        var_cost   = st.number_input("Variable Kosten (%)", 0.0, 1.0, CFG_VAR_COST*100) / 100.0
+
+        # ### OPTIMIZER START – Sidebar‑Widgets  ###
+        st.markdown("---")
+        st.header("🚀 Optimizer")
 
-    _opt_trials  = st.sidebar.number_input("Versuche", 10, 500, 50, 10)
+        _kpi_weights = {
+            "Sharpe Ratio": st.slider("Sharpe‑Gewicht", 0.0, 3.0, 1.0, 0.1),
+            "Ulcer Index":  -st.slider("Ulcer‑Gewicht",  0.0, 3.0, 1.0, 0.1),
+            "CAGR (%)":     st.slider("CAGR‑Gewicht",   0.0, 3.0, 1.0, 0.1),
+        }
+
+        _opt_trials  = st.number_input("Versuche", 10, 500, 50, 10)
     
-    # --- Buttons -----------------------------------------------
-    run_opt_btn = st.sidebar.button("Optimizer starten 🚀")
-    run_btn     = st.sidebar.button("Backtest starten 🚀")
+        # --- Buttons -----------------------------------------------
+        run_opt_btn = st.form_submit_button("Optimizer starten 🚀")
+        run_btn     = st.form_submit_button("Backtest starten 🚀")
+
+    custom_months = custom_slider if rebalance_freq == "custom" else 1
+
+    # Jetzt, wo beide existieren, validieren
+    if start_date >= end_date:
+        st.sidebar.error("Startdatum muss vor dem Enddatum liegen.")
+        return
 
-    # Wenn *keiner* gedrückt wurde → zurück
+    # Wenn *keiner* gedrückt wurde → letztes Ergebnis (z. B. nach
+    # Ansichtswechsel) erneut anzeigen, sonst zurück
     if not run_btn and not run_opt_btn:
-        st.info("Stelle alle Parameter ein und klicke auf einen der Start‑Buttons.")
+        last = st.session_state.get("bt_result")
+        if last is None:
+            st.info("Stelle alle Parameter ein und klicke auf einen der Start‑Buttons.")
+            return
+        st.success(last["msg"])
+        _render_backtest_results(last["engine"], last["ui_params"], last["run_id"])
         return
 
     # — VALIDIERUNG —
@@ -199,7 +379,7 @@ def show_backtester_ui():
         return
 
     # — 9) Ticker + PriceData laden + Pivot … und Backtest laufen lassen —
-    tickers = dm.get_tickers_for(month, sources)
+    tickers = _tickers_for(month, tuple(sorted(sources)))
 
     #DEBUG
     #st.write(f"🔎 got {len(tickers)} tickers:", tickers)
@@ -214,40 +394,18 @@ def show_backtester_ui():
         if mode.startswith("statisch")
         else f"{month}-01"
     )
-    # Statt history_start / month-Logik:
-    raw = dm.get_price_data(
-        tickers,
-        start_date.strftime("%Y-%m-%d"),
-        end_date.strftime("%Y-%m-%d")
+    # Statt history_start / month-Logik: (gecachte) Preis-Matrix laden –
+    # bereits auf Business-Days reindexiert, forward-filled und float32
+    price_df = _load_bday_prices(
+        tuple(sorted(tickers)),
+        start_date.isoformat(),
+        end_date.isoformat(),
     )
 
-    #DEBUG
-    #st.write(f"🔎 got {len(raw)} raw price records")
-
-    #if raw:
-    #    st.write(raw[:3])  # oder raw[0].model_dump() / raw[0].dict()
-    #------------------------
-
-    if not raw:
+    if price_df.empty:
         st.error("Keine Preisdaten gefunden.")
         return
 
-    price_df = (
-        pd.DataFrame([r.model_dump() for r in raw])
-          .assign(date=lambda df: pd.to_datetime(df["trade_date"]))
-          .pivot(index="date", columns="ticker", values="close")
-          .sort_index()
-    )
-
-    # ① komplette Business-Day-Range vom Backtest-Start bis -Ende erzeugen
-    full_idx = pd.date_range(start_date, end_date, freq=BDay())
-
-    # ② reindex auf die volle Zeitachse
-    price_df = price_df.reindex(full_idx)
-
-    # ③ fehlende Kurse per forward-fill aus dem letzten bekannten Kurs ziehen
-    price_df = price_df.fillna(method="ffill")
-
     # ‣ wenn weniger Ticker da sind als num_stocks, auf available runterschrauben
     orig_num_stocks = num_stocks
     available = price_df.shape[1]
@@ -263,29 +421,30 @@ def show_backtester_ui():
     #st.write(price_df.head())
     #----------------------
 
-    with st.spinner("📈 Backtest läuft…"):
-        engine = SharpeBacktestEngine(
-            price_df,
-            start_balance,
-            num_stocks,
-            start_month=month,
-            universe_mode="static" if mode.startswith("statisch") else "dynamic",
-            optimizer_method=opt_method,
-            cov_estimator=cov_estimator,
-            rebalance_frequency=rebalance_freq,
-            custom_rebalance_months=custom_months,
-            window_days=window_days,
-            min_weight=min_w,
-            max_weight=max_w,
-            force_equal_weight=force_eq,
-            enable_trading_costs=enable_tc,
-            fixed_cost_per_trade=fixed_cost,
-            variable_cost_pct=var_cost,
-            optimization_mode=opt_mode,
-        )
-
-        engine.universe_mode = "static" if mode.startswith("statisch") else "dynamic"
+    # Identische Parameter + identische Preise → Engine aus dem Cache statt
+    # kompletter Neuberechnung (gleicher Cache wie die Optimizer-Replays)
+    run_kwargs = dict(
+        start_balance=start_balance,
+        num_stocks=num_stocks,
+        start_month=month,
+        universe_mode="static" if mode.startswith("statisch") else "dynamic",
+        optimizer_method=opt_method,
+        cov_estimator=cov_estimator,
+        rebalance_frequency=rebalance_freq,
+        custom_rebalance_months=custom_months,
+        window_days=window_days,
+        min_weight=min_w,
+        max_weight=max_w,
+        force_equal_weight=force_eq,
+        enable_trading_costs=enable_tc,
+        fixed_cost_per_trade=fixed_cost,
+        variable_cost_pct=var_cost,
+        optimization_mode=opt_mode,
+    )
+    price_digest = _frame_digest(price_df)
+    kwargs_items = tuple(sorted(run_kwargs.items()))
 
+    with st.spinner("📈 Backtest läuft…"):
         # collect infos for Parameter tab
         ui_params = {
             "Backtest Startdatum": start_date.strftime("%Y-%m-%d"),
@@ -313,7 +472,7 @@ def show_backtester_ui():
         #st.write(f"🔎 running backtest on {price_df.shape[0]} days × {price_df.shape[1]} tickers")
         #----------------------
 
-        engine.run_with_next_month_allocation()
+        engine = _replay_backtest(price_digest, kwargs_items, price_df)
 
         #DEBUG
         #st.write("🔎 final portfolio_value:", engine.portfolio_value.tail())
@@ -325,299 +484,362 @@ def show_backtester_ui():
         msg += f"  (Achtung: nur {available} Stocks vorhanden statt {orig_num_stocks})"
     st.success(msg)
 
-    # Tabs
-    tabs = st.tabs([
-        "Dashboard",
-        "Daily",
-        "Monthly",
-        "Yearly",
-        "Monthly Allocation",
-        "Next Month Allocation",
-        "Drawdowns",
-        "Trading Costs",
-        "Rebalance",
-        "Paramter",
-        "Logs"
-    ])
-
-    with tabs[0]:
-        st.subheader("🔍 KPI-Übersicht")
-        if not engine.performance_metrics.empty:
-            st.dataframe(engine.performance_metrics, hide_index=True, use_container_width=True)
+    # Ergebnis für spätere Reruns (Ansichtswechsel) in der Session ablegen;
+    # run_id aus Digest + Parametern → gleicher Lauf trifft auch den Excel-Cache
+    run_id = hashlib.blake2b(
+        repr((price_digest, kwargs_items)).encode(), digest_size=16
+    ).hexdigest()
+    st.session_state["bt_result"] = {
+        "engine":    engine,
+        "ui_params": ui_params,
+        "msg":       msg,
+        "run_id":    run_id,
+    }
+    _render_backtest_results(engine, ui_params, run_id)
 
-        st.markdown("---")
-        st.subheader("📈 Portfolio-Verlauf")
-        if not engine.portfolio_value.empty:
-            st.line_chart(engine.portfolio_value)
 
-        st.markdown("---")
-        st.subheader("📆 Monatliche Performance (%)")
-        if not engine.monthly_performance.empty:
-            st.bar_chart(
-                engine.monthly_performance.set_index("Date")["Monthly PnL (%)"]
-            )
-
-    with tabs[1]:
-        st.subheader("📅 Daily Portfolio")
-        if not engine.daily_df.empty:
-            st.dataframe(engine.daily_df, use_container_width=True)
-
-    with tabs[2]:
-        st.subheader("🗓️ Monthly Performance Detail")
-        if not engine.price_data.empty and not engine.portfolio_value.empty:
-            # 1) Monats-Endkurse und Monats-End-Portfolio-Wert
-            monthly_prices  = engine.price_data.resample("ME").last()
-            monthly_balance = engine.portfolio_value.resample("ME").last()
-
-            # 2) Index-Namen setzen, damit reset_index() eine Spalte "Date" erzeugt
-            monthly_prices.index.name  = "Date"
-            monthly_balance.index.name = "Date"
-
-            # 3) Monatsrenditen in Prozent
-            monthly_returns = monthly_prices.pct_change().dropna(how="all") * 100
-
-            # 4) Portfolio-Monatsrendite aus engine.monthly_performance
-            port_rets = (
-                engine.monthly_performance
-                    .set_index("Date")["Monthly PnL (%)"]
-            )
-
-            # 5) alles in ein DataFrame packen
-            df = monthly_returns.copy()
-            df["Balance"]    = monthly_balance
-            df["Return (%)"] = port_rets
-
-            # 6) Index in Spalte umwandeln – jetzt gibt es garantiert eine Spalte "Date"
-            df = df.reset_index()
-
-            # 7) Jahr und Monatsname aus "Date" ableiten
-            df["Year"]  = df["Date"].dt.year
-            df["Month"] = df["Date"].dt.month_name()
-
-            # 8) **WICHTIG**: zuerst nach Date absteigend sortieren
-            df = df.sort_values("Date", ascending=False).reset_index(drop=True)
-
-            # 9) dann die finalen Spalten in der gewünschten Reihenfolge auswählen
-            cols = ["Year", "Month", "Return (%)", "Balance"] + list(monthly_returns.columns)
-            df = df[cols]
-
-            # 10) Formatierung: Prozent-Spalten mit 1 Dezimalstelle und Prozentzeichen
-            percent_cols = ["Return (%)"] + list(monthly_returns.columns)
-            fmt = {
-                **{c: "{:.1f}%" for c in percent_cols},   # Prozent-Spalten mit 1 Dezimalstelle + '%'
-                "Balance": "{:,.0f}"                      # Balance ohne Dezimalstellen, Tausender-Komma
-            }
-            styled = df.style.format(fmt)
-
-            st.dataframe(styled, use_container_width=True)
-
-        else:
-            st.info("Keine Daten für Monthly Performance.")
-
-    with tabs[3]:
-        st.subheader("🗓️ Yearly Performance Detail")
-        if not engine.price_data.empty and not engine.portfolio_value.empty:
-            # 1) Jahr-Endkurse und Jahr-End-Portfolio-Wert
-            yearly_prices  = engine.price_data.resample("YE").last()
-            yearly_balance = engine.portfolio_value.resample("YE").last()
-
-            # 2) Index benennen, damit reset_index eine Date-Spalte erzeugt
-            yearly_prices.index.name  = "Date"
-            yearly_balance.index.name = "Date"
-
-            # 3) Jahres-Renditen in Prozent für alle Ticker
-            yearly_returns  = yearly_prices.pct_change().dropna(how="all") * 100
-
-            # 4) Portfolio-Jahresrendite
-            port_year_rets = yearly_balance.pct_change().dropna() * 100
-
-            # 5) DataFrame zusammenbauen
-            df_year = yearly_returns.copy()
-            df_year["Balance"]    = yearly_balance
-            df_year["Return (%)"] = port_year_rets
-
-            # 6) Index in Spalte umwandeln
-            df_year = df_year.reset_index()
-
-            # 7) Year aus der Date-Spalte
-            df_year["Year"] = df_year["Date"].dt.year
-
-            # 8) Spalten in gewünschter Reihenfolge
-            cols = ["Year", "Return (%)", "Balance"] + list(yearly_returns.columns)
-            df_year = df_year[cols]
-
-            # 9) Neueste Jahre zuerst
-            df_year = df_year.sort_values("Year", ascending=False).reset_index(drop=True)
-
-            # 10) Prozentformatierung auf 1 Dezimalstelle
-            percent_cols = ["Return (%)"] + list(yearly_returns.columns)
-            fmt = {
-                **{c: "{:.1f}%" for c in percent_cols},     # Percent columns
-                "Balance": "{:,.0f}"                        # Balance: no decimals, comma as thousands separator
-            }
-            styled = df_year.style.format(fmt)
-
-            st.dataframe(styled, use_container_width=True)
-        else:
-            st.info("Keine Daten für Yearly Performance.")
-
-
-    with tabs[4]:
-        st.subheader("📊 Monthly Allocation")
-        if not engine.monthly_allocations.empty:
-            df_sorted = engine.monthly_allocations.sort_values(
-                by="Rebalance Date",
-                ascending=False
-            )
-            st.dataframe(df_sorted, use_container_width=True)
-
-    with tabs[5]:
-        # hole das letzte Datum aus engine.portfolio_value (oder price_data)
-        last_date = engine.price_data.index.max()
-
-        # bestimme den aktuellen Monat und addiere 1
-        next_period = last_date.to_period("M") + 1
-
-        # formatiere Anf- und Enddatum
-        start = next_period.to_timestamp(how="start").strftime("%d. %B %Y")
-        end   = next_period.to_timestamp(how="end").strftime("%d. %B %Y")
-
-        # Anzeige in Deinem Tab:
-        st.subheader("🔮 Next Month Allocation")
-        st.markdown(f"**Zeitraum:** {start} – {end}")
-
-        if hasattr(engine, "next_month_weights"):
-            df_next = (
-                engine.next_month_weights
-                    .mul(100)               # in Prozent
-                    .reset_index()
-            )
-            df_next.columns = ["Ticker","Gewicht (%)"]
-            st.dataframe(df_next, use_container_width=True)
-        else:
-            st.info("Keine Auswahl für den Folgemonat (zu wenige Daten).")
-
-    with tabs[6]:
-        st.subheader("📉 Top 10 Drawdowns")
-        # Drawdown-Berechnung
-        df_port = engine.portfolio_value.to_frame(name="Portfolio")
-        df_port["Peak"] = df_port["Portfolio"].cummax()
-        df_port["Drawdown"] = df_port["Portfolio"] / df_port["Peak"] - 1
-
-        # Drawdown-Episoden extrahieren
-        periods = []
-        in_dd = False
-        for date, row in df_port.iterrows():
-            if not in_dd and row["Drawdown"] < 0:
-                in_dd = True
-                start = date
-                peak_val = row["Peak"]
-                trough_val = row["Portfolio"]
-                trough = date
-            elif in_dd:
-                if row["Portfolio"] < trough_val:
-                    trough_val = row["Portfolio"]
-                    trough = date
-                if row["Portfolio"] >= peak_val:
-                    # Drawdown abgeschlossen
-                    periods.append({
-                        "Start":            start.date(),
-                        "Trough":           trough.date(),
-                        "End":              date.date(),
-                        "Length (Days)":    (date - start).days,
-                        "Recovery Time":    (date - trough).days,
-                        "Drawdown (%)":     round((trough_val/peak_val - 1)*100, 2),
-                    })
-                    in_dd = False
-
-        # laufende DD-Periode (falls nicht abgeschlossen)
-        if in_dd:
-            last_date = df_port.index[-1]
-            periods.append({
-                "Start":         start.date(),
-                "Trough":        trough.date(),
-                "End":           last_date.date(),
-                "Length (Days)": (last_date - start).days,
-                "Recovery Time": None,
-                "Drawdown (%)":  round((trough_val/peak_val - 1)*100, 2),
-            })
-
-        # Top 10 sortiert nach Drawdown‐Size
-        df_dd = (
-            pd.DataFrame(periods)
-            .sort_values(by="Drawdown (%)")  # drawdowns sind negativ, also aufsteigend = größter Drawdown zuerst
-            .head(10)
-            .reset_index(drop=True)
+# -----------------------------------------------------------------------------
+# Backtester-Ansichten (werden nur für die gewählte Ansicht ausgeführt)
+# -----------------------------------------------------------------------------
+def _downsample_line(series):
+    """
+    Lange Linien vor st.line_chart ausdünnen: je Bucket nur Min und Max
+    behalten – Drawdown-Tiefs und Hochs bleiben sichtbar, der Browser
+    bekommt aber höchstens ≈ _CHART_TARGET_BARS Punkte.
+    """
+    n = len(series)
+    if n <= _CHART_MAX_BARS:
+        return series
+    step = -(-n // (_CHART_TARGET_BARS // 2))
+    vals = np.pad(series.to_numpy(), (0, -n % step), mode="edge").reshape(-1, step)
+    base = np.arange(vals.shape[0]) * step
+    keep = np.concatenate([base + vals.argmin(axis=1), base + vals.argmax(axis=1), [0, n - 1]])
+    return series.iloc[np.unique(np.minimum(keep, n - 1))]
+
+
+def _render_dashboard(engine):
+    st.subheader("🔍 KPI-Übersicht")
+    if not engine.performance_metrics.empty:
+        st.dataframe(engine.performance_metrics, hide_index=True, use_container_width=True)
+
+    st.markdown("---")
+    st.subheader("📈 Portfolio-Verlauf")
+    if not engine.portfolio_value.empty:
+        st.line_chart(_downsample_line(engine.portfolio_value))
+
+    st.markdown("---")
+    st.subheader("📆 Monatliche Performance (%)")
+    if not engine.monthly_pnl_pct.empty:
+        st.bar_chart(engine.monthly_pnl_pct)
+
+
+def _render_daily(engine):
+    st.subheader("📅 Daily Portfolio")
+    if not engine.daily_df.empty:
+        st.dataframe(engine.daily_df, use_container_width=True)
+
+
+def _format_perf_table(df, percent_cols):
+    """
+    Formatiert Prozent-Spalten ("{:.1f}%") und Balance ("{:,.0f}") einmal
+    als Strings – bei breiten Tabellen deutlich billiger als Styler/Jinja.
+    """
+    formatted = df[percent_cols].map("{:.1f}%".format, na_action="ignore")
+    formatted["Balance"] = df["Balance"].map("{:,.0f}".format, na_action="ignore")
+    rest = df.drop(columns=formatted.columns)
+    return pd.concat([rest, formatted], axis=1)[df.columns]
+
+
+def _render_monthly(engine):
+    st.subheader("🗓️ Monthly Performance Detail")
+    if not engine.price_data.empty and not engine.portfolio_value.empty:
+        # 1) Monatsrenditen (%) je Ticker + Monats-End-Portfolio-Wert
+        #    (einmal pro Lauf im Engine berechnet, Index heißt "Date")
+        monthly_returns, monthly_balance, _ = engine.period_frames("ME")
+
+        # 2) Portfolio-Monatsrendite (im Engine bereits nach Date indiziert)
+        port_rets = engine.monthly_pnl_pct
+
+        # 3) alles in einem Schritt zu einem DataFrame zusammenbauen:
+        #    Balance/Return anhängen, Index → Spalte "Date", Jahr + Monatsname
+        df = (
+            monthly_returns
+                .join([monthly_balance.rename("Balance"), port_rets.rename("Return (%)")])
+                .reset_index()
+                .assign(
+                    Year=lambda d: d["Date"].dt.year,
+                    Month=lambda d: d["Date"].dt.month_name(),
+                )
         )
 
-        # Spaltenreihenfolge und Header anpassen
-        df_dd = df_dd[
-            ["Start", "End", "Length (Days)", "Recovery Time", "Trough", "Drawdown (%)"]
-        ]
-        df_dd.columns = [
-            "Start", "End", "Length", "Recovery Time", "Underwater Period", "Drawdown"
-        ]
+        # 4) **WICHTIG**: zuerst nach Date absteigend sortieren
+        df = df.sort_values("Date", ascending=False).reset_index(drop=True)
+
+        # 5) dann die finalen Spalten in der gewünschten Reihenfolge auswählen
+        cols = ["Year", "Month", "Return (%)", "Balance"] + list(monthly_returns.columns)
+        df = df[cols]
+
+        # 6) Formatierung: Prozent-Spalten mit 1 Dezimalstelle und Prozentzeichen
+        percent_cols = ["Return (%)"] + list(monthly_returns.columns)
+        st.dataframe(_format_perf_table(df, percent_cols), use_container_width=True)
+
+    else:
+        st.info("Keine Daten für Monthly Performance.")
+
+
+def _render_yearly(engine):
+    st.subheader("🗓️ Yearly Performance Detail")
+    if not engine.price_data.empty and not engine.portfolio_value.empty:
+        # 1) Jahresrenditen (%) je Ticker, Jahres-End-Portfolio-Wert und
+        # 2) Portfolio-Jahresrendite (alles einmal pro Lauf im Engine berechnet)
+        yearly_returns, yearly_balance, port_year_rets = engine.period_frames("YE")
+
+        # 3) DataFrame in einem Schritt zusammenbauen (Index → "Date", Year daraus)
+        df_year = (
+            yearly_returns
+                .join([yearly_balance.rename("Balance"), port_year_rets.rename("Return (%)")])
+                .reset_index()
+                .assign(Year=lambda d: d["Date"].dt.year)
+        )
+
+        # 4) Spalten in gewünschter Reihenfolge
+        cols = ["Year", "Return (%)", "Balance"] + list(yearly_returns.columns)
+        df_year = df_year[cols]
+
+        # 5) Neueste Jahre zuerst
+        df_year = df_year.sort_values("Year", ascending=False).reset_index(drop=True)
+
+        # 6) Prozentformatierung auf 1 Dezimalstelle
+        percent_cols = ["Return (%)"] + list(yearly_returns.columns)
+        st.dataframe(_format_perf_table(df_year, percent_cols), use_container_width=True)
+    else:
+        st.info("Keine Daten für Yearly Performance.")
+
+
+def _render_monthly_allocation(engine):
+    st.subheader("📊 Monthly Allocation")
+    if not engine.monthly_allocations.empty:
+        df_sorted = engine.monthly_allocations.sort_values(
+            by="Rebalance Date",
+            ascending=False
+        )
+        st.dataframe(df_sorted, use_container_width=True)
+
+
+def _render_next_month(engine):
+    # hole das letzte Datum aus engine.portfolio_value (oder price_data)
+    last_date = engine.price_data.index.max()
+
+    # bestimme den aktuellen Monat und addiere 1
+    next_period = last_date.to_period("M") + 1
+
+    # formatiere Anf- und Enddatum
+    start = next_period.to_timestamp(how="start").strftime("%d. %B %Y")
+    end   = next_period.to_timestamp(how="end").strftime("%d. %B %Y")
+
+    # Anzeige in Deinem Tab:
+    st.subheader("🔮 Next Month Allocation")
+    st.markdown(f"**Zeitraum:** {start} – {end}")
+
+    if hasattr(engine, "next_month_weights"):
+        df_next = (
+            engine.next_month_weights
+                .mul(100)               # in Prozent
+                .reset_index()
+        )
+        df_next.columns = ["Ticker","Gewicht (%)"]
+        st.dataframe(df_next, use_container_width=True)
+    else:
+        st.info("Keine Auswahl für den Folgemonat (zu wenige Daten).")
+
+
+def _render_drawdowns(engine):
+    st.subheader("📉 Top 10 Drawdowns")
+    # degenerierter Lauf (leer oder nur ein Tag): keine Episoden möglich
+    if len(engine.portfolio_value) < 2:
+        st.info("Keine Daten für Drawdowns.")
+        return
+
+    # Peak/Drawdown liegen nach dem Lauf bereits als Arrays im Engine
+    dates = engine.portfolio_value.index
+    pv    = engine.portfolio_value.to_numpy(dtype=np.float64)
+    peak  = engine.pv_peak
+    under = engine.pv_drawdown < 0
+
+    # Drawdown-Episoden vektorisiert extrahieren:
+    # Start = erster Tag unter Wasser, Ende = erster Tag zurück auf dem Peak
+    edges = np.diff(under.astype(np.int8), prepend=np.int8(0))
+    starts = np.flatnonzero(edges == 1)
+    ends   = np.flatnonzero(edges == -1)
+
+    # Episoden spaltenweise aufbauen (kein dict pro Episode);
+    # laufende DD-Periode (nicht abgeschlossen) endet am letzten Datum
+    closed = np.arange(len(starts)) < len(ends)
+    stops  = np.append(ends, len(pv))[:len(starts)]
+    e_idx  = np.minimum(stops, len(pv) - 1)
+    t_idx  = np.array(
+        [s_i + np.argmin(pv[s_i:e_i]) for s_i, e_i in zip(starts, stops)], dtype=np.intp
+    )
+    dd_pct = np.round((pv[t_idx] / peak[starts] - 1) * 100, 2)
+
+    # Top 10 sortiert nach Drawdown‐Size (negativ → aufsteigend = größter zuerst)
+    top = np.argsort(dd_pct, kind="stable")[:10]
+    start_dt, trough_dt, end_dt = dates[starts[top]], dates[t_idx[top]], dates[e_idx[top]]
+    recovery = (end_dt - trough_dt).days.to_numpy(dtype=float)
+    recovery[~closed[top]] = np.nan
+    df_dd = pd.DataFrame({
+        "Start":         start_dt.date,
+        "Trough":        trough_dt.date,
+        "End":           end_dt.date,
+        "Length (Days)": (end_dt - start_dt).days,
+        "Recovery Time": recovery if not closed[top].all() else recovery.astype(int),
+        "Drawdown (%)":  dd_pct[top],
+    })
+
+    # Spaltenreihenfolge und Header anpassen
+    df_dd = df_dd[
+        ["Start", "End", "Length (Days)", "Recovery Time", "Trough", "Drawdown (%)"]
+    ]
+    df_dd.columns = [
+        "Start", "End", "Length", "Recovery Time", "Underwater Period", "Drawdown"
+    ]
+
+    st.dataframe(df_dd, use_container_width=True)
+
+
+def _render_trading_costs(engine):
+    st.subheader("💸 Trading Costs")
+    if not engine.monthly_allocations.empty and "Trading Costs" in engine.monthly_allocations:
+        allocs = engine.monthly_allocations.dropna(subset=["Trading Costs"])
+        # kategorischer Key: Gruppierung über Integer-Codes statt date-Objekte
+        cost_df = (
+            allocs
+                .groupby(allocs["Rebalance Date"].astype("category"), observed=True)["Trading Costs"]
+                .sum()
+                .reset_index(name="Total Trading Costs")
+        )
+        st.dataframe(cost_df, use_container_width=True)
+    else:
+        st.info("Keine Trading-Kosten-Daten vorhanden.")
+
+
+def _render_rebalance(engine):
+    st.subheader("🔁 Rebalance Analysis")
+    df_reb = engine.selection_df
+    # nur echte Rebalances, keine SUMMARY-Zeile; Kopie, damit engine.selection_df unverändert bleibt
+    df_reb = df_reb[df_reb["Rebalance Date"] != "SUMMARY"].copy()
+    if len(df_reb) > 1:
+        df_reb["Rebalance Date"] = pd.to_datetime(df_reb["Rebalance Date"], format="%Y-%m-%d")
+        df_reb["Days Since Last"] = df_reb["Rebalance Date"].diff().dt.days
+    st.dataframe(df_reb, use_container_width=True)
+
+
+def _render_params(engine, ui_params):
+    st.subheader("⚙️ Ausgewählte Backtest-Parameter")
+    df_params = pd.DataFrame(ui_params.items(), columns=["Parameter", "Wert"])
+    df_params["Wert"] = df_params["Wert"].astype(str)
+    st.dataframe(df_params, use_container_width=True)
+
+
+def _render_logs(engine):
+    st.subheader("🪵 Logs")
+    # ein Element statt eines st.text pro Zeile – tausende Frontend-Nodes je Rerun vermeiden
+    st.text("\n".join(engine.ticker_coverage_logs + engine.log_lines))
+
+
+@st.cache_data(show_spinner=False, max_entries=4)
+def _excel_report(run_id, _engine):
+    """Excel-Report als Bytes (BytesIO statt Temp-Datei), gecacht pro Lauf."""
+    buf = io.BytesIO()
+    export_results_to_excel(_engine, buf)
+    return buf.getvalue()
+
+
+@st.fragment
+def _render_active_view(engine, ui_params):
+    """
+    Ansichts-Auswahl + gewählte Ansicht als Fragment: ein Ansichtswechsel
+    rerunnt nur diesen Block, nicht Sidebar/Preisladen/Excel-Button.
+    """
+    views = {
+        "Dashboard":               lambda: _render_dashboard(engine),
+        "Daily":                   lambda: _render_daily(engine),
+        "Monthly":                 lambda: _render_monthly(engine),
+        "Yearly":                  lambda: _render_yearly(engine),
+        "Monthly Allocation":      lambda: _render_monthly_allocation(engine),
+        "Next Month Allocation":   lambda: _render_next_month(engine),
+        "Drawdowns":               lambda: _render_drawdowns(engine),
+        "Trading Costs":           lambda: _render_trading_costs(engine),
+        "Rebalance":               lambda: _render_rebalance(engine),
+        "Paramter":                lambda: _render_params(engine, ui_params),
+        "Logs":                    lambda: _render_logs(engine),
+    }
+    view = st.radio("Ansicht", list(views), horizontal=True, key="bt_view")
+    views[view]()
+
+
+def _render_backtest_results(engine, ui_params, run_id):
+    """
+    Zeigt die Ergebnisse des zuletzt gelaufenen Backtests. Statt st.tabs
+    (führt bei jedem Rerun *alle* Tab-Bodies aus) wird nur die gewählte
+    Ansicht berechnet.
+    """
+    _render_active_view(engine, ui_params)
+
+    # Excel erst auf Anforderung bauen (einmal pro Lauf, danach aus dem Cache) –
+    # wer nur die Ansichten anschaut, zahlt keinen Workbook-Export
+    excel_key = f"excel_ready_{run_id}"
+    if not st.session_state.get(excel_key) and st.button("📄 Excel-Report vorbereiten"):
+        st.session_state[excel_key] = True
+    if st.session_state.get(excel_key):
+        with st.spinner("📥 Excel-Report wird erstellt…"):
+            report = _excel_report(run_id, engine)
+        st.download_button(
+            "📥 Excel-Report",
+            report,
+            file_name=f"AlphaMachine_{dt.date.today()}.xlsx",
+            mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        )
 
-        st.dataframe(df_dd, use_container_width=True)
-
-    # Tab 5: Trading Costs
-    with tabs[7]:
-        st.subheader("💸 Trading Costs")
-        if not engine.monthly_allocations.empty and "Trading Costs" in engine.monthly_allocations:
-            cost_df = (
-                engine.monthly_allocations
-                    .dropna(subset=["Trading Costs"])
-                    .groupby("Rebalance Date")["Trading Costs"]
-                    .sum()
-                    .reset_index(name="Total Trading Costs")
-            )
-            st.dataframe(cost_df, use_container_width=True)
-        else:
-            st.info("Keine Trading-Kosten-Daten vorhanden.")
-
-    # Tab 6: Rebalance Analysis
-    with tabs[8]:
-        st.subheader("🔁 Rebalance Analysis")
-        df_reb = pd.DataFrame(engine.selection_details)
-        # nur echte Rebalances, keine SUMMARY-Zeile
-        df_reb = df_reb[df_reb["Rebalance Date"] != "SUMMARY"].copy()
-        if len(df_reb) > 1:
-            df_reb["Rebalance Date"] = pd.to_datetime(df_reb["Rebalance Date"])
-            df_reb["Days Since Last"] = df_reb["Rebalance Date"].diff().dt.days
-        st.dataframe(df_reb, use_container_width=True)
-
-    # Tab 7: Parameters
-    with tabs[9]:
-        st.subheader("⚙️ Ausgewählte Backtest-Parameter")
-        df_params = pd.DataFrame(ui_params.items(), columns=["Parameter", "Wert"])
-        df_params["Wert"] = df_params["Wert"].astype(str)
-        st.dataframe(df_params, use_container_width=True)
-
-    # Tab 8: Logs
-    with tabs[10]:
-        st.subheader("🪵 Logs")
-        for line in engine.ticker_coverage_logs + engine.log_lines:
-            st.text(line)
-
-    # Excel Download
-    with tempfile.TemporaryDirectory() as tmp_dir:
-        tmp_path = os.path.join(tmp_dir,"AlphaMachine_Report.xlsx")
-        export_results_to_excel(engine,tmp_path)
-        with open(tmp_path,"rb") as f:
-            st.download_button(
-                "📥 Excel-Report",
-                f.read(),
-                file_name=f"AlphaMachine_{dt.date.today()}.xlsx",
-                mime="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
-            )
-  
 
 # =============================================================================
 # === Data-Management-UI ===
 # =============================================================================
+@st.fragment
+def _periods_editor(dm, month, source):
+    """
+    Period-Tabelle + Löschen als Fragment: die ID-Auswahl rerunnt nur diesen
+    Block, nicht TickerInfo/Chart. Nach dem Löschen folgt ein voller Rerun,
+    damit Monats-/Quellen-Auswahl die geleerten Caches neu lesen.
+    """
+    msg = st.session_state.pop("periods_msg", None)
+    if msg:
+        st.success(msg)
+
+    dfp = _periods_frame(month, source)
+    if dfp.empty:
+        st.info("Keine Period-Einträge für diesen Monat/Quelle.")
+        return
+
+    st.dataframe(
+        dfp.set_index('id'),
+        use_container_width=True,
+        column_config={
+            "start_date": st.column_config.DateColumn(format="YYYY-MM-DD"),
+            "end_date":   st.column_config.DateColumn(format="YYYY-MM-DD"),
+        },
+    )
+    to_del = st.multiselect("Zu löschen (ID)", dfp['id'].tolist())
+    if st.button("🗑️ Löschen"):
+        deleted = dm.delete_periods([int(pid) for pid in to_del])
+        _clear_lookup_caches()
+        st.session_state["periods_msg"] = f"{deleted} Einträge gelöscht."
+        st.rerun()
+
+
 def show_data_ui():
     st.header("📂 Data Management")
-    dm = StockDataManager()
+    dm = get_dm()
 
     mode = st.radio("Modus", ["➕ Add/Update", "👁️ View/Delete"], index=0)
 
@@ -626,12 +848,11 @@ def show_data_ui():
         tickers = st.text_area("Tickers (eine pro Zeile)", height=120)
         month_dt = st.date_input("Monat wählen", value=dt.date.today().replace(day=1))
         start = month_dt.replace(day=1)
-        end = (pd.to_datetime(start) + pd.offsets.MonthEnd(1)).date()
+        end = start.replace(day=calendar.monthrange(start.year, start.month)[1])
         st.write(f"Zeitraum: {start} bis {end}")
         
         # erst bestehende Quellen aus der DB holen (plus Default-Werte)
-        with get_session() as session:
-            existing = list(session.exec(select(TickerPeriod.source)).unique())
+        existing = _existing_sources()
         defaults = ["Topweights"]
         options = sorted(set(existing + defaults))
         options.append("Andere…")
@@ -644,66 +865,80 @@ def show_data_ui():
                 source = custom
         
         if st.button("➕ Hinzufügen"):
-            ts = [t.strip() for t in tickers.splitlines() if t.strip()]
+            # strip + Leerzeilen raus + Duplikate entfernen (Reihenfolge bleibt)
+            lines = pd.Series(tickers.splitlines(), dtype="string").str.strip()
+            ts = lines[lines.str.len() > 0].drop_duplicates().tolist()
             added = dm.add_tickers_for_period(ts, start.strftime("%Y-%m-%d"), end.strftime("%Y-%m-%d"), source)
+            _clear_lookup_caches()
             st.success(f"{len(added)} Ticker hinzugefügt.")
 
+        max_workers = st.number_input(
+            "Parallele Downloads", min_value=1, max_value=32, value=8,
+            help="Anzahl gleichzeitiger Yahoo-Abfragen (bei Rate-Limits reduzieren)",
+        )
         if st.button("🔄 Preise updaten"):
             with get_session() as session:
-                tickers_db = session.exec(select(TickerPeriod.ticker)).unique()
-                tickers_db = [t for t in tickers_db]
+                tickers_db = list(session.exec(select(TickerPeriod.ticker).distinct()).all())
             if not tickers_db:
                 st.info("Keine Ticker in der DB zum Updaten.")
                 return
             progress = st.progress(0.0)
             status = st.empty()
-            updated = []
-            for idx, tk in enumerate(tickers_db):
-                status.info(f"📡 Lade Preise für {tk} …")
-                success = dm.update_ticker_data([tk])
-                updated += success
-                progress.progress((idx + 1) / len(tickers_db))
+            status.info(f"📡 Lade Preise für {len(tickers_db)} Ticker …")
+            updated, failed = [], []
+            ui_step = max(1, len(tickers_db) // 100)
+            # I/O-bound (HTTP + DB) → parallel im ThreadPool; Streamlit-Elemente
+            # werden nur im Haupt-Thread aktualisiert
+            try:
+                with ThreadPoolExecutor(max_workers=int(max_workers)) as ex:
+                    futures = {ex.submit(dm.update_ticker_data, [tk]): tk for tk in tickers_db}
+                    for idx, fut in enumerate(as_completed(futures)):
+                        tk = futures[fut]
+                        try:
+                            updated += fut.result()
+                        # Netzwerk, yfinance (z. B. Rate-Limit), DB – ein Ticker
+                        # bricht nicht den ganzen Lauf ab
+                        except Exception as e:
+                            failed.append(f"{tk}: {e}")
+                        # UI nur ca. 100× pro Lauf aktualisieren (jedes Update = Websocket-Roundtrip)
+                        if (idx + 1) % ui_step == 0 or idx + 1 == len(tickers_db):
+                            status.info(f"📡 {tk} fertig ({idx + 1}/{len(tickers_db)})")
+                            progress.progress((idx + 1) / len(tickers_db))
+            finally:
+                # bereits committete Ticker sind in der DB → Caches immer leeren
+                _load_price_matrix.clear()
+                _load_bday_prices.clear()
+                _price_chart.clear()
+                _ticker_info_frame.clear()
+                _ticker_date_ranges.clear()
             status.success("✅ Alle Ticker geladen.")
             st.success(f"{len(updated)} von {len(tickers_db)} Ticker aktualisiert.")
+            if failed:
+                st.warning(f"⚠️ {len(failed)} Ticker fehlgeschlagen:")
+                st.write(failed)
         return  # hier bleiben wir im Add/Update-Modus und brechen ab
 
     # ——— View/Delete Mode —————————————————————————————————————————————————————————
     st.subheader("👁️ View/Delete")
-    with get_session() as session:
-        all_periods = session.exec(select(TickerPeriod)).all()
-    Monate  = sorted({p.start_date.strftime("%Y-%m") for p in all_periods})
-    Quellen = sorted({p.source for p in all_periods})
+    Monate, Quellen = _period_months_and_sources()
     month   = st.selectbox("Monat",  Monate)
     source  = st.selectbox("Quelle", Quellen)
 
-    periods = dm.get_periods(month, source)
-    if periods:
-        dfp = pd.DataFrame([vars(p) for p in periods])[['id','ticker','start_date','end_date','source']]
-        st.dataframe(dfp.set_index('id'), use_container_width=True)
-        to_del = st.multiselect("Zu löschen (ID)", dfp['id'].tolist())
-        if st.button("🗑️ Löschen"):
-            for pid in to_del:
-                dm.delete_period(pid)
-            st.success(f"{len(to_del)} Einträge gelöscht.")
-            st.experimental_rerun()
-            return
-    else:
-        st.info("Keine Period-Einträge für diesen Monat/Quelle.")
-        # kein return hier, wir wollen trotzdem TickerInfo sehen
+    _periods_editor(dm, month, source)
+    # kein return hier, wir wollen trotzdem TickerInfo sehen
 
     st.markdown("---")
     st.subheader("Ticker Info")
-    info = dm.get_ticker_info()
-    if not info:
+    dfi = _ticker_info_frame()
+    if dfi.empty:
         st.info("Keine TickerInfo vorhanden.")
         return   # hier abbrechen, weil kein dfi gebildet werden kann
 
-    # DataFrame für TickerInfo bauen und optional filtern
-    dfi = pd.DataFrame([vars(i) for i in info]).drop(columns=["_sa_instance_state"], errors="ignore")
+    # DataFrame für TickerInfo optional filtern
     all_cols = list(dfi.columns)
     filter_col = st.selectbox("Filter-Spalte", ["(kein)"] + all_cols, index=0)
     if filter_col != "(kein)":
-        choices = sorted(dfi[filter_col].dropna().unique())
+        choices = dfi[filter_col].dropna().drop_duplicates().sort_values().tolist()
         sel = st.multiselect(f"Werte in «{filter_col}»", choices, default=choices)
         dfi = dfi[dfi[filter_col].isin(sel)]
     st.dataframe(dfi.set_index("id"), use_container_width=True)
@@ -712,39 +947,21 @@ def show_data_ui():
     st.markdown("---")
     st.subheader("📈 Price Chart")
     
-    ticker_sel = st.selectbox("Welchen Ticker charten?", sorted(dfi["ticker"].unique()))
-    default_start = dfi.loc[dfi["ticker"] == ticker_sel, "actual_start_date"].min()
-    default_end   = dfi.loc[dfi["ticker"] == ticker_sel, "actual_end_date"].max()
+    ticker_sel = st.selectbox(
+        "Welchen Ticker charten?", dfi["ticker"].drop_duplicates().sort_values().tolist()
+    )
+    default_start, default_end = _ticker_date_ranges().loc[ticker_sel]
     start_sel, end_sel = st.date_input("Zeitraum wählen", value=(default_start, default_end))
 
-    raw = dm.get_price_data([ticker_sel], start_sel.strftime("%Y-%m-%d"), end_sel.strftime("%Y-%m-%d"))
-
-    #DEBUG
-    #st.write(f"🔎 got {len(raw)} raw price records")
-    #if raw:
-    #    st.write(raw[:3])  # oder raw[0].model_dump() / raw[0].dict()
-    
-    records = [{"date":r.trade_date, "open":r.open, "high":r.high, "low":r.low, "close":r.close, "volume":r.volume} for r in raw]
-    pdf = pd.DataFrame(records)
-    if pdf.empty:
+    fig, missing = _price_chart(ticker_sel, start_sel.isoformat(), end_sel.isoformat())
+    if fig is None:
         st.info("Keine Preisdaten im gewählten Zeitraum.")
         return
 
-    pdf["date"] = pd.to_datetime(pdf["date"])
-    pdf = pdf.sort_values("date").set_index("date")
-    fig = go.Figure(data=[go.Candlestick(
-        x=pdf.index, open=pdf["open"], high=pdf["high"],
-        low=pdf["low"], close=pdf["close"], name=ticker_sel
-    )])
-    fig.update_layout(title=f"Candlestick for {ticker_sel}", xaxis_title="Date", yaxis_title="Price")
     st.plotly_chart(fig, use_container_width=True)
-
-    us_bd = CustomBusinessDay(calendar=USFederalHolidayCalendar())
-    full_range = pd.date_range(start_sel, end_sel, freq=us_bd)
-    missing = full_range.difference(pdf.index)
-    if not missing.empty:
+    if missing:
         st.warning(f"⚠️ {len(missing)} Handelstage ohne Daten:")
-        st.write(missing.strftime("%Y-%m-%d").tolist())
+        st.write(missing)
 
 # -----------------------------------------------------------------------------
 # Optimizer
@@ -753,10 +970,8 @@ def show_optimizer_ui():
     st.header("⚙️ Hyperparameter-Optimizer")
 
     # ---------- Daten-Selektion ------------------------------------
-    dm = StockDataManager()
-    month   = st.selectbox("Start-Monat (Universe)", dm.get_periods_distinct_months())
-    with get_session() as session:
-        existing = session.exec(select(TickerPeriod.source)).all()
+    month   = st.selectbox("Start-Monat (Universe)", _distinct_months())
+    existing = _existing_sources()
     defaults = ["Topweights", "TR20"]
     sources  = st.multiselect("Quellen", sorted(set(existing + defaults)), default=defaults)
     col1, col2 = st.columns(2)
@@ -769,15 +984,6 @@ def show_optimizer_ui():
         st.warning("⚠️ Keine Preisdaten gefunden.")
         st.stop()
 
-    # Vollständige Handelstage-Range + NaN-Handling
-    from pandas.tseries.offsets import BDay
-    full_idx = pd.date_range(start_date, end_date, freq=BDay())
-    price_df = (
-        price_df
-        .reindex(full_idx)
-        .ffill()  # forward-fill – kein bfill mehr
-    )
-
     # ---------- Suchraum-Editor ------------------------------------
     PARAMS = {
         "num_stocks":        ("Anzahl Aktien", 5, 50, 1),
@@ -785,9 +991,9 @@ def show_optimizer_ui():
         "min_weight":        ("Min-Weight %", 0.0, 5.0, 0.5),
         "max_weight":        ("Max-Weight %", 5.0, 50.0, 1.0),
         "force_equal_weight":("Equal-Weight", [False, True]),
-        "optimization_mode": ("Mode", ["select-then-optimize", "optimize-subset"]),
-        "optimizer_method":  ("Optimizer", ["ledoit-wolf", "minvar", "hrp"]),
-        "cov_estimator":     ("Cov-Estimator", ["ledoit-wolf", "constant-corr", "factor-model"]),
+        "optimization_mode": ("Mode", list(_OPT_MODES)),
+        "optimizer_method":  ("Optimizer", list(_OPT_METHODS)),
+        "cov_estimator":     ("Cov-Estimator", list(_COV_ESTS)),
     }
 
     search_space = {}
@@ -833,10 +1039,54 @@ def show_optimizer_ui():
 
     if st.button("🚀 Suche starten"):
         study = run_optimizer(price_df, base_kwargs, search_space, kpi_weights, n_trials)
-        show_study_results(study, kpi_weights, price_df, base_kwargs)
+        # Studie + Eingaben merken: spätere Widget-Reruns (z. B. Run-Auswahl)
+        # zeigen dieselben Ergebnisse, ohne neu zu optimieren
+        st.session_state["last_study"] = {
+            "study":        study,
+            "kpi_weights":  kpi_weights,
+            "price_df":     price_df,
+            "price_digest": _frame_digest(price_df),
+            "fixed_kwargs": base_kwargs,
+        }
+
+    last = st.session_state.get("last_study")
+    if last is not None:
+        show_study_results(
+            last["study"], last["kpi_weights"], last["price_df"], last["fixed_kwargs"],
+            price_digest=last["price_digest"],
+        )
+
+def _frame_digest(df):
+    """BLAKE2b über Werte + Achsen – billiger Cache-Key statt pandas-Hashing."""
+    h = hashlib.blake2b(digest_size=16)
+    h.update(np.ascontiguousarray(df.to_numpy()).tobytes())
+    h.update(repr((df.shape, df.index[0], df.index[-1], tuple(df.columns))).encode())
+    return h.hexdigest()
+
+
+# Eine Engine hält Preis-Matrix, Daily-/Allocation-Frames und Logs – wenige
+# Einträge reichen (aktueller Backtest + Best-/ausgewählter Optimizer-Run),
+# ttl gibt liegengebliebene Läufe wieder frei
+@st.cache_resource(max_entries=4, ttl=3600, show_spinner="🔁 Backtest läuft…")
+def _replay_backtest(price_digest, kwargs_items, _price_df):
+    """
+    Backtest (Backtester-Lauf oder Best-/ausgewählter Optimizer-Run). Gecacht
+    auf (Preis-Digest, Parameter), damit identische Läufe nicht erneut
+    gerechnet werden.
+
+    cache_resource liefert allen Sessions *dasselbe* Objekt: die Engine ist
+    nach dem Lauf read-only (Perioden-Frames sind vorberechnet), Ansichten
+    dürfen ihre Attribute nicht in-place ändern, sondern nur Kopien.
+    """
+    eng = SharpeBacktestEngine(_price_df, **dict(kwargs_items))
+    eng.run_with_next_month_allocation()
+    return eng
+
+
+def show_study_results(study, kpi_weights, price_df, fixed_kwargs, price_digest=None):
+    if price_digest is None:
+        price_digest = _frame_digest(price_df)
 
-def show_study_results(study, kpi_weights, price_df, fixed_kwargs):
-    
     # ------- A) Trials-DataFrame aufbereiten -----------------------
     df = study.trials_dataframe()
 
@@ -847,12 +1097,10 @@ def show_study_results(study, kpi_weights, price_df, fixed_kwargs):
             for main, sec in df.columns.to_list()
         ]
 
-    # Optuna ≤ 3 → user_attrs aufsplitten
+    # Optuna ≤ 3 → user_attrs aufsplitten (eine Frame-Konstruktion statt Series pro Zeile)
     if "user_attrs" in df.columns:
-        df = pd.concat(
-            [df.drop(columns=["user_attrs"]), df["user_attrs"].apply(pd.Series)],
-            axis=1
-        )
+        attrs = pd.DataFrame.from_records(df["user_attrs"].tolist(), index=df.index)
+        df = pd.concat([df.drop(columns=["user_attrs"]), attrs], axis=1)
 
     # Präfixe entfernen
     df = df.rename(columns=lambda c: re.sub(r"^(param_|params_|user_attrs?_)", "", c))
@@ -895,8 +1143,7 @@ def show_study_results(study, kpi_weights, price_df, fixed_kwargs):
         if "window_days" not in run_kwargs:
             run_kwargs["window_days"] = fixed_kwargs.get("window_days")
 
-        eng_sel = SharpeBacktestEngine(price_df, **run_kwargs)
-        eng_sel.run_with_next_month_allocation()
+        eng_sel = _replay_backtest(price_digest, tuple(sorted(run_kwargs.items())), price_df)
 
         st.subheader(f"🔍 Backtest-Ergebnisse für Run {sel_num}")
         st.markdown("---")
@@ -916,8 +1163,7 @@ def show_study_results(study, kpi_weights, price_df, fixed_kwargs):
     if "window_days" not in run_kwargs:
         run_kwargs["window_days"] = fixed_kwargs.get("window_days")
 
-    eng_best = SharpeBacktestEngine(price_df, **run_kwargs)
-    eng_best.run_with_next_month_allocation()
+    eng_best = _replay_backtest(price_digest, tuple(sorted(run_kwargs.items())), price_df)
 
     # ------- D) Best-Run KPIs & Parameter -------------------------
     best = top_df.iloc[0]
@@ -6,3 +6,12 @@ def test_ema_indicator_sign():
     ind = EMAIndicator(period=2)
     scores = ind.calculate(df)
     assert scores.iloc[-1] > 0          # letzter Wert positiv
+
+def test_ema_calculate_matrix_matches_per_column():
+    import numpy as np
+    prices = pd.DataFrame({"a": [100, 101, 102, 110], "b": [50, 49, 48, 47]})
+    ind = EMAIndicator(period=2)
+    mat = ind.calculate_matrix(prices.to_numpy(dtype=float))
+    for j, col in enumerate(prices):
+        single = ind.calculate(prices[[col]].rename(columns={col: "close"}))
+        np.testing.assert_allclose(mat[:, j], single.to_numpy(), rtol=1e-6)
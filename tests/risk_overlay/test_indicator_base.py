@@ -6,3 +6,21 @@ def test_default_mode():
             return data["close"]*0
     assert Dummy().mode == Dummy.mode.BOTH
 
+
+def test_normalize_np_matches_pandas_zscore():
+    import numpy as np
+    import pandas as pd
+    s = pd.Series([1.0, 2.0, np.nan, 4.0, 8.0])
+    expected = ((s - s.mean()) / s.std()).to_numpy()
+    np.testing.assert_allclose(IndicatorBase.normalize_np(s.to_numpy()), expected, rtol=1e-6)
+    assert not IndicatorBase.normalize_np(np.full(5, 3.0)).any()
+
+def test_default_confidence_is_one():
+    import pandas as pd
+    class Dummy(IndicatorBase):
+        def calculate(self, data):
+            return data["close"]*0
+    score = pd.Series([0.5, -1.0, 2.0])
+    conf = Dummy().confidence(score)
+    assert conf.index.equals(score.index)
+    assert (conf == 1.0).all()
@@ -0,0 +1,14 @@
+import json
+from AlphaMachine_core.risk_overlay.indicator_factory import load_indicators
+
+def test_load_indicators_returns_independent_copies(tmp_path):
+    cfg = tmp_path / "overlay.json"
+    cfg.write_text(json.dumps({"indicators": [
+        {"path": "AlphaMachine_core.risk_overlay.indicators.sma", "class": "SMAIndicator",
+         "params": {"period": 20}, "weight": 0.5},
+    ]}))
+    first = load_indicators(str(cfg))
+    first[0].weight = 2.0
+    second = load_indicators(str(cfg))
+    assert second[0].period == 20
+    assert second[0].weight == 0.5
@@ -0,0 +1,25 @@
+import numpy as np
+import pandas as pd
+from AlphaMachine_core.risk_overlay.indicators._kernels import ewm_adjust_false, ema_cross, rolling_mean, ema_weights, ewm_window
+
+def test_ewm_adjust_false_matches_pandas():
+    close = pd.Series(100 + np.cumsum(np.random.default_rng(1).normal(size=500)))
+    expected = close.ewm(span=20, adjust=False).mean().to_numpy()
+    np.testing.assert_allclose(ewm_adjust_false(close.to_numpy(), 2 / 21), expected)
+
+def test_ema_cross_matches_two_ewms():
+    close = pd.Series(100 + np.cumsum(np.random.default_rng(2).normal(size=500)))
+    expected = (close.ewm(span=5, adjust=False).mean() - close.ewm(span=30, adjust=False).mean()).to_numpy()
+    np.testing.assert_allclose(ema_cross(close.to_numpy(), 2 / 6, 2 / 31), expected, atol=1e-9)
+
+def test_rolling_mean_matches_pandas_with_nans():
+    close = pd.Series([1.0, np.nan, 3.0, 4.0, np.nan, np.nan, np.nan, 8.0])
+    expected = close.rolling(window=3, min_periods=1).mean().to_numpy()
+    np.testing.assert_allclose(rolling_mean(close.to_numpy(), 3), expected)
+
+def test_ewm_window_equals_recursive_ema_restarted_per_window():
+    close = 100 + np.cumsum(np.random.default_rng(3).normal(size=120))
+    alpha, window = 2 / 11, 20
+    result = ewm_window(close, ema_weights(alpha, window), alpha)
+    expected = [ewm_adjust_false(close[max(0, i - window + 1):i + 1], alpha)[-1] for i in range(close.size)]
+    np.testing.assert_allclose(result, expected)
@@ -0,0 +1,30 @@
+import pandas as pd
+from AlphaMachine_core.risk_overlay.overlay import RiskOverlay, to_frame
+from AlphaMachine_core.risk_overlay.indicators.ema import EMAIndicator
+from AlphaMachine_core.risk_overlay.indicators.sentiment import SentimentZScoreIndicator
+
+def test_overlay_score_matches_single_indicators():
+    df = pd.DataFrame({"close": [100, 101, 102, 110], "sentiment": [0.1, 0.2, 0.1, 2.0]})
+    ema, sent = EMAIndicator(period=2), SentimentZScoreIndicator()
+    arr, names, index = RiskOverlay([ema, sent]).score(df)
+    assert arr.shape == (4, 2)
+    assert names == ["EMAIndicator(period=2)", "SentimentZScoreIndicator(column=sentiment)"]
+    frame = to_frame(arr, names, index)
+    pd.testing.assert_series_equal(frame[ema.name], ema.calculate(df), check_names=False)
+    pd.testing.assert_series_equal(frame[sent.name], sent.calculate(df), check_names=False)
+
+def test_prepared_data_converts_columns_once():
+    from AlphaMachine_core.risk_overlay import PreparedData
+    view = PreparedData.of(pd.DataFrame({"close": [1.0, 2.0, 3.0]}))
+    assert view.close_np is view.close_np
+    assert PreparedData.of(view) is view
+    assert view["close"].iloc[-1] == 3.0
+
+def test_prepared_data_shares_rolling_means_between_indicators():
+    from AlphaMachine_core.risk_overlay import PreparedData
+    from AlphaMachine_core.risk_overlay.indicators.sma import SMAIndicator
+    from AlphaMachine_core.risk_overlay.indicators.ma200 import MA200CloseIndicator
+    df = pd.DataFrame({"close": [100.0] * 20 + [90.0, 89.0, 88.0]})
+    view = PreparedData.of(df)
+    RiskOverlay([SMAIndicator(period=20), MA200CloseIndicator(ma_period=20)]).score(view)
+    assert set(view.derived) == {("prefix", "close"), ("rolling_mean", "close", 20)}
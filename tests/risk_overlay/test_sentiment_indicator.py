@@ -10,3 +10,14 @@ def test_sentiment_indicator_zscore():
     assert score.idxmax() == 4
     # Die Z-Scores um den Mittelwert herum liegen nahe 0
     assert abs(score.iloc[0]) < 1.5
+
+def test_sentiment_incremental_matches_batch_zscore():
+    values = [0.1, 0.2, 0.1, 0.2, 2.0]
+    ind = SentimentZScoreIndicator()
+    for v in values[:-1]:
+        ind.calculate_incremental(v)
+    last = ind.calculate_incremental(values[-1])
+    batch = ind.calculate(pd.DataFrame({"sentiment": values}))
+    assert abs(last - batch.iloc[-1]) < 1e-5
+    ind.reset()
+    assert ind.calculate_incremental(1.0) == 0.0
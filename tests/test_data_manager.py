@@ -0,0 +1,24 @@
+import datetime as dt
+
+import numpy as np
+import pandas as pd
+import pytest
+
+pytest.importorskip("yfinance")
+pytest.importorskip("sqlmodel")
+
+from AlphaMachine_core.data_manager import _price_rows
+
+
+def test_price_rows_fill_missing_volume_with_zero():
+    new_df = pd.DataFrame({
+        "date": [dt.date(2024, 1, 2), dt.date(2024, 1, 3)],
+        "open": [10.0, 11.0], "high": [10.5, 11.5], "low": [9.5, 10.5], "close": [10.2, 11.2],
+        "volume": [1500.0, np.nan],
+        "ticker": "AAA",
+    })
+    rows = _price_rows(new_df)
+    assert [r["volume"] for r in rows] == [1500, 0]
+    assert all(type(r["volume"]) is int and type(r["close"]) is float for r in rows)
+    assert rows[0] == {"ticker": "AAA", "trade_date": dt.date(2024, 1, 2), "open": 10.0,
+                       "high": 10.5, "low": 9.5, "close": 10.2, "volume": 1500}
@@ -0,0 +1,75 @@
+import contextlib
+import io
+import os
+
+import numpy as np
+import pandas as pd
+
+os.environ.setdefault("DATABASE_URL", "sqlite://")   # config.py verlangt eine URL, der Engine braucht keine DB
+
+from AlphaMachine_core.engine import SharpeBacktestEngine, _drawdown_stats
+
+
+def _synthetic_prices():
+    rng = np.random.default_rng(7)
+    dates = pd.bdate_range("2021-01-01", "2022-06-30")
+    rets = rng.normal(0.0004, 0.015, size=(len(dates), 6)) + np.linspace(-0.0005, 0.001, 6)
+    return pd.DataFrame(100 * np.cumprod(1 + rets, axis=0), index=dates, columns=list("ABCDEF"))
+
+def _run(engine):
+    with contextlib.redirect_stdout(io.StringIO()):
+        engine.run_with_next_month_allocation()
+    return engine
+
+def _reference_drawdown_stats(values):
+    # Ursprüngliche Pandas-Variante vor dem fusionierten Durchlauf
+    pv = pd.Series(values, dtype=float)
+    dd = pv / pv.cummax() - 1
+    neg = dd[dd < 0]
+    if neg.empty:
+        return dd.min(), np.nan, np.nan
+    return dd.min(), np.sqrt((neg ** 2).mean()) * 100, -neg.mean()
+
+def test_drawdown_stats_matches_reference():
+    values = 100 * np.cumprod(1 + np.random.default_rng(4).normal(0, 0.02, size=500))
+    expected = _reference_drawdown_stats(values)
+    np.testing.assert_allclose(_drawdown_stats(values), expected)
+    dd = values / np.maximum.accumulate(values) - 1
+    np.testing.assert_allclose(_drawdown_stats(values, drawdown=dd), expected)
+
+def test_drawdown_stats_without_drawdown_is_nan():
+    max_dd, ui, avg_dd = _drawdown_stats(np.array([1.0, 2.0, 3.0]))
+    assert max_dd == 0.0
+    assert np.isnan(ui) and np.isnan(avg_dd)
+
+def test_drawdown_metrics_match_baseline():
+    # Erwartungswerte aus dem Lauf vor der Umstellung auf _drawdown_stats
+    e = _run(SharpeBacktestEngine(_synthetic_prices(), 100000, 3, "2022-01", window_days=60, force_equal_weight=True))
+    metrics = dict(zip(e.performance_metrics["Metric"], e.performance_metrics["Value"]))
+    assert metrics["Max Drawdown (%)"] == "-14.39%"
+    assert metrics["Ulcer Index"] == "7.02"
+    assert metrics["Pain Ratio"] == "-0.14"
+    np.testing.assert_allclose(
+        _drawdown_stats(e.portfolio_value.to_numpy(), drawdown=e.pv_drawdown),
+        (-0.14387126651416238, 7.020813123345962, 0.05802866850807578),
+    )
+
+def test_portfolio_value_matches_baseline():
+    # Stützstellen aus der ursprünglichen Pandas-Schleife der Tagesbewertung
+    pv = _run(SharpeBacktestEngine(_synthetic_prices(), 100000, 3, "2022-01", window_days=60, force_equal_weight=True)).portfolio_value
+    assert len(pv) == 369
+    assert pv.index[0] == pd.Timestamp("2021-02-01") and pv.index[-1] == pd.Timestamp("2022-06-30")
+    np.testing.assert_allclose(
+        pv.iloc[[0, 100, 200, -1]].to_numpy(),
+        [100477.036885, 88490.356263, 99075.815761, 98824.844771],
+        rtol=1e-9,
+    )
+
+def test_from_arrays_matches_dataframe_constructor():
+    prices = _synthetic_prices()
+    kwargs = dict(window_days=60, force_equal_weight=True)
+    expected = _run(SharpeBacktestEngine(prices, 100000, 3, "2022-01", **kwargs)).portfolio_value
+    result = _run(SharpeBacktestEngine.from_arrays(
+        prices.to_numpy(), prices.index.values, prices.columns.values, 100000, 3, "2022-01", **kwargs
+    )).portfolio_value
+    pd.testing.assert_series_equal(result, expected, check_freq=False)   # .values verliert nur die freq
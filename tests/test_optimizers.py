@@ -0,0 +1,39 @@
+import numpy as np
+import pandas as pd
+from scipy.optimize import check_grad
+
+from AlphaMachine_core.optimizers import _neg_sharpe_objective, _variance_objective, optimize_portfolio
+
+
+def _cov_and_means(n=5, seed=0):
+    rng = np.random.default_rng(seed)
+    returns = rng.normal(0.0005, 0.01, size=(250, n)) + np.linspace(0, 0.001, n)
+    return np.cov(returns, rowvar=False), returns.mean(axis=0)
+
+def test_variance_gradient_matches_finite_differences():
+    cov, _ = _cov_and_means()
+    w = np.random.default_rng(1).dirichlet(np.ones(5))
+    err = check_grad(lambda x: _variance_objective(x, cov)[0], lambda x: _variance_objective(x, cov)[1], w)
+    assert err < 1e-6 * np.linalg.norm(_variance_objective(w, cov)[1])
+
+def test_neg_sharpe_gradient_matches_finite_differences():
+    cov, mean_returns = _cov_and_means()
+    f = lambda x: _neg_sharpe_objective(x, cov, mean_returns)[0]
+    g = lambda x: _neg_sharpe_objective(x, cov, mean_returns)[1]
+    for seed in range(3):
+        w = np.random.default_rng(seed).dirichlet(np.ones(5))
+        assert check_grad(f, g, w) < 1e-5 * np.linalg.norm(g(w))
+
+def test_neg_sharpe_value_matches_definition():
+    cov, mean_returns = _cov_and_means()
+    w = np.full(5, 0.2)
+    expected = -(w @ mean_returns) / np.sqrt(w @ cov @ w)
+    assert np.isclose(_neg_sharpe_objective(w, cov, mean_returns)[0], expected)
+
+def test_optimize_portfolio_respects_bounds():
+    rng = np.random.default_rng(3)
+    returns = pd.DataFrame(rng.normal(0.0005, 0.01, size=(250, 6)), columns=list("ABCDEF"))
+    for method in ("ledoit-wolf", "minvar"):
+        w = optimize_portfolio(returns, method=method, min_weight=0.05, max_weight=0.4)
+        assert np.isclose(w.sum(), 1.0)
+        assert (w >= 0.05 - 1e-8).all() and (w <= 0.4 + 1e-8).all()